@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark of setting attributes on the Observed subclasses, e.g. Units,
+which positions are set each frame. LegacyObserved reproduces the former
+Observed.__setattr__, which checked for observers on each assignment, and is
+compared with the current Observed, which notifies observers only of changes
+of the attributes declared with ObservedAttribute.
+
+Run it from the root directory of the project:
+
+    python -m benchmarks.observed_setattr
+"""
+
+from timeit import repeat
+from typing import Any, Callable, Dict
+
+from utils.observer import Observed, ObservedAttribute, Observer
+
+SETS = 1_000_000
+REPEATS = 5
+
+
+class LegacyObserved(Observed):
+
+    def __setattr__(self, key, value):
+        try:
+            if key in self.observed_attributes:
+                self.notify_all_observers(key, value)
+        except AttributeError:
+            pass  # happens only once, during __init__ when observed_attributes is not initialized yet
+        finally:
+            super().__setattr__(key, value)
+
+
+class SpriteLike:
+    """Stand-in of the arcade.Sprite with its property-based position setters."""
+
+    def __init__(self):
+        self._position = [0.0, 0.0]
+        self.health = 100.0
+
+    @property
+    def center_x(self) -> float:
+        return self._position[0]
+
+    @center_x.setter
+    def center_x(self, new_value: float):
+        if new_value != self._position[0]:
+            self._position[0] = new_value
+
+
+class LegacyUnit(SpriteLike, LegacyObserved):
+
+    def __init__(self):
+        SpriteLike.__init__(self)
+        LegacyObserved.__init__(self)
+
+
+class Unit(SpriteLike, Observed):
+
+    def __init__(self):
+        SpriteLike.__init__(self)
+        Observed.__init__(self)
+
+
+class ObservedHealthUnit(Unit):
+    health = ObservedAttribute()
+
+
+class HealthBar(Observer):
+
+    def on_being_attached(self, attached: Observed):
+        pass
+
+    def notify(self, attribute: str, value: Any):
+        pass
+
+    def on_being_detached(self, detached: Observed):
+        pass
+
+
+def nanoseconds_per_set(statement: Callable[[], None]) -> float:
+    return min(repeat(statement, number=SETS, repeat=REPEATS)) / SETS * 1e9
+
+
+def benchmark() -> Dict[str, float]:
+    legacy, unit, observed = LegacyUnit(), Unit(), ObservedHealthUnit()
+    watched = ObservedHealthUnit()
+    watched.attach(HealthBar(), 'health')
+
+    def set_center_x(entity):
+        def statement():
+            entity.center_x = 1.0
+            entity.center_x = 2.0
+        return statement
+
+    def set_health(entity):
+        def statement():
+            entity.health = 1.0
+            entity.health = 2.0
+        return statement
+
+    # each statement sets the attribute twice:
+    return {name: nanoseconds_per_set(statement) / 2 for name, statement in (
+        ('legacy plain attribute', set_health(legacy)),
+        ('plain attribute', set_health(unit)),
+        ('legacy center_x property', set_center_x(legacy)),
+        ('center_x property', set_center_x(unit)),
+        ('ObservedAttribute, no observers', set_health(observed)),
+        ('ObservedAttribute, one observer', set_health(watched)),
+    )}
+
+
+if __name__ == '__main__':
+    for name, nanoseconds in benchmark().items():
+        print(f'{name:>32}: {nanoseconds:7.1f} ns per set ({1e3 / nanoseconds:6.1f}M sets/s)')
@@ -27,6 +27,7 @@ from utils.functions import (
     get_path_to_file, ignore_in_editor_mode, add_extension
 )
 from utils.geometry import generate_2d_grid, clamp
+from utils.level_of_detail import UpdateTier
 from utils.constants import CURSOR_ENTER_TEXTURE, TILE_WIDTH, TILE_HEIGHT, FUEL, AMMUNITION, ENERGY, STEEL, ELECTRONICS, \
     CONSCRIPTS, UI_BUILDINGS_PANEL, UI_UNITS_CONSTRUCTION_PANEL, CONSTRUCTION_SITE
 
@@ -71,6 +72,7 @@ class UnitsProducer:
 
     @log_this_call()
     def start_production(self, unit_name: str):
+        self.wake_up()
         costs = self.produced_units[unit_name]
         if self.player.enough_resources_for(expense=unit_name, costs=costs):
             self.consume_resources_from_the_pool(unit_name)
@@ -237,6 +239,7 @@ class ResearchFacility:
         self.researched_technology = None
 
     def start_research(self, technology: Technology):
+        self.wake_up()
         if self.player.knows_all_required(technology.required):
             self.researched_technologies[technology] = 0
             self.required_funding += technology.funding_cost
@@ -335,10 +338,9 @@ class Building(PlayerEntity, UnitsProducer, ResourceProducer, ResearchFacility):
         if (buildings := self.configs.get('allows_construction')) is not None:
             self.player.buildings_possible_to_build.extend(buildings)
 
-        self.layered_spritelist.swap_rendering_layers(
-            self, 0, position_to_map_grid(*self.position)[1]
-        )
+        self.layered_spritelist.swap_rendering_layers(self, position_to_map_grid(*self.position)[1])
         self.player.recalculate_energy_balance()
+        self.game.sleeping_entities.wake_enemies_near(self)
 
     @property
     def is_selected(self) -> bool:
@@ -402,9 +404,12 @@ class Building(PlayerEntity, UnitsProducer, ResourceProducer, ResearchFacility):
         node.building = self
 
     def update_observed_area(self, *args, **kwargs):
-        if not self.observed_nodes:  # Building need calculate it only once
-            self.observed_grids = grids = self.calculate_observed_area()
-            self.observed_nodes = {self.map[grid] for grid in grids}
+        if self.observed_grid is None:  # Building need calculate it only once
+            gx, gy = grid = position_to_map_grid(*self.position)
+            self.observer_footprint = max(
+                max(abs(x - gx), abs(y - gy)) for (x, y) in (n.grid for n in self.occupied_nodes)
+            )
+            self.start_observing(grid)
 
     @ignore_in_editor_mode
     def update_battle_behaviour(self):
@@ -430,12 +435,29 @@ class Building(PlayerEntity, UnitsProducer, ResourceProducer, ResearchFacility):
             self.game.mouse.force_cursor(index=None)
 
     def on_update(self, delta_time: float = 1 / 60):
+        if self.is_sleeping:
+            return self.update_visibility()
         super().on_update(delta_time)
         self.update_production(delta_time)
         self.update_observed_area()
         self.update_ui_buildings_panel()
         if self.autodestruction_progress:
             self.update_autodestruction()
+        elif self.can_sleep:
+            self.fall_asleep()
+
+    @property
+    def update_tier(self) -> UpdateTier:
+        # autodestruction progresses each frame:
+        return UpdateTier.FULL if self.autodestruction_progress else super().update_tier
+
+    @property
+    def can_sleep(self) -> bool:
+        return super().can_sleep and not (
+            (self.produced_units is not None and (self.currently_produced or self.production_queue))
+            or self.produced_resource not in (None, ENERGY)
+            or (self.research_facility and self.researched_technologies)
+        )
 
     def update_autodestruction(self):
         self.autodestruction_progress += 0.25
@@ -517,6 +539,7 @@ class Building(PlayerEntity, UnitsProducer, ResourceProducer, ResearchFacility):
         return demolish_button
 
     def start_autodestruction(self):
+        self.wake_up()
         if not self.autodestruction_progress:
             self.autodestruction_progress += 1
             self.game.sound_player.play_sound('preparing_to_autodestruction.wav')
@@ -584,6 +607,8 @@ class Building(PlayerEntity, UnitsProducer, ResourceProducer, ResearchFacility):
         self.known_enemies.clear()
 
     def change_player(self, new_player: Player):
+        # Building observes the map for its new Faction after next update:
+        self.stop_observing()
         self.detach(self.player)
         self.attach(new_player)
         self.player.recalculate_energy_balance()
@@ -603,10 +628,6 @@ class Building(PlayerEntity, UnitsProducer, ResourceProducer, ResearchFacility):
         finally:
             self.update_garrison_button()
 
-    def on_being_damaged(self, damage: float, penetration: float = 0) -> float:
-        # TODO: killing personnel inside Building
-        return super().on_being_damaged(damage)
-
     def kill(self):
         if self.garrisoned_soldiers:
             self.kill_garrisoned_soldiers()
@@ -661,6 +682,7 @@ class ConstructionSite(Building):
     When Player decides where to build a nwe Building, the ConstructionSite is raised there for the construction time.
     When Building construction is completed, ConstructionSite disappears and actual Building is spawned in its place.
     """
+    drawn_separately = True  # to draw the construction progress bar
 
     def __init__(self, building_name: str, player: Player, position):
         self.size = self.game.configs[building_name]['size']
@@ -680,6 +702,14 @@ class ConstructionSite(Building):
         )
         self.object_name = CONSTRUCTION_SITE
 
+    @property
+    def can_sleep(self) -> bool:
+        return False
+
+    @property
+    def update_tier(self) -> UpdateTier:
+        return UpdateTier.FULL  # construction progresses each frame
+
     def on_update(self, delta_time: float = 1 / 60):
         super().on_update(delta_time)
         self.construction_progress += 1
@@ -102,7 +102,7 @@ class TimePassedTrigger(EventTrigger):
 
 class MapRevealedTrigger(EventTrigger):
     def condition_fulfilled(self) -> bool:
-        return len(self.game.fog_of_war.unexplored) == 0
+        return self.game.fog_of_war.map_revealed()
 
 
 class NoUnitsLeftTrigger(EventTrigger):
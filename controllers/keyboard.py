@@ -39,6 +39,12 @@ class KeyboardHandler(ToggledElement):
     def evaluate_pressed_key(self, symbol: int):
         if symbol == P and self.window.is_game_running:
             self.window.game.toggle_pause()
+        elif symbol == T and self.window.is_game_running:
+            self.window.game.toggle_turbo_mode()
+        elif symbol == F3:
+            self.window.instrumentation.toggle()
+        elif symbol == F4:
+            self.window.dump_trace()
         elif symbol == U and self.window.is_game_running:
             self.window.game.show_construction_options(UI_UNITS_CONSTRUCTION_PANEL)
         elif symbol == B and self.window.is_game_running:
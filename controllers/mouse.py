@@ -406,7 +406,7 @@ class MouseCursor(AnimatedTimeBasedSprite, ToggledElement, EventsCreator):
 
     def cursor_on_terrain_with_selected_units(self):
         grid = position_to_map_grid(*self.position)
-        if self.game.map.walkable(grid) or grid in self.game.fog_of_war.unexplored:
+        if self.game.map.walkable(grid) or not self.game.fog_of_war.is_explored(grid):
             self.set_texture(CURSOR_MOVE_TEXTURE)
         else:
             self.set_texture(CURSOR_FORBIDDEN_TEXTURE)
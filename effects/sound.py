@@ -38,6 +38,8 @@ class SoundPlayer:
         self._sound_on = window.settings.sound_on
         self._music_on = window.settings.music_on
         self._sound_effects_on = window.settings.sound_effects_on
+        # effects are muted in the simulation ticks fast-forwarded by the Game:
+        self.effects_muted = False
 
         self._sound_volume: float = window.settings.sound_volume
         self._music_volume: float = window.settings.music_volume
@@ -177,7 +179,7 @@ class SoundPlayer:
             return
         elif self.is_music(name) and not self.music_on:
             return
-        elif not self.sound_effects_on:
+        elif not self.sound_effects_on or self.effects_muted:
             return
 
         if volume is None and sound_position is not None and self.max_sound_distance is not None:
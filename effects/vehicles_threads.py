@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import numpy as np
+
+from arcade import Sprite, SpriteList, Texture
+
+# number of alpha levels threads pass through while disappearing:
+FADE_STEPS = 16
+
+
+class VehicleThreadsLayer:
+    """
+    Ring-buffer of the threads-decals left on the ground by Vehicles. Sprites
+    are created only until the 'capacity' is reached, and then the oldest
+    decal is reused for each new one, so the cost of drawing threads does not
+    grow with the distance driven by Vehicles.
+
+    Instead of each decal fading on its own, the time each one was left is
+    kept in array, and alpha of the whole layer is computed once per frame,
+    quantized to FADE_STEPS levels, so only the few sprites which reached the
+    next level are updated in the buffer.
+    """
+
+    def __init__(self, settings, capacity: int = 1024):
+        self.settings = settings
+        self.capacity = capacity
+        self.sprites = SpriteList(is_static=True)
+        self.spawn_times = np.zeros(capacity, dtype=np.float64)
+        self.fade_levels = np.zeros(capacity, dtype=np.int8)
+        self.next_slot = 0
+        self.time = 0.0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.fade_levels))
+
+    def add(self, texture: Texture, x: float, y: float):
+        slot = self.next_slot
+        self.next_slot = (slot + 1) % self.capacity
+        if slot < len(self.sprites):
+            sprite = self.sprites[slot]
+            sprite.texture = texture
+            sprite.position = x, y
+            sprite.alpha = 255
+        else:
+            sprite = Sprite(center_x=x, center_y=y, hit_box_algorithm='None')
+            sprite.texture = texture
+            self.sprites.append(sprite)
+        self.spawn_times[slot] = self.time
+        self.fade_levels[slot] = FADE_STEPS
+
+    def on_update(self, delta_time: float = 1 / 60):
+        self.time += delta_time
+        if not (count := len(self.sprites)):
+            return
+        fadeout = max(self.settings.threads_fadeout_seconds, delta_time)
+        ages = self.time - self.spawn_times[:count]
+        levels = np.ceil((1.0 - ages / fadeout) * FADE_STEPS).clip(0, FADE_STEPS).astype(np.int8)
+        changed = np.flatnonzero(levels != self.fade_levels[:count])
+        if not changed.size:
+            return
+        self.fade_levels[:count] = levels
+        sprites = self.sprites
+        for i, level in zip(changed.tolist(), levels[changed].tolist()):
+            sprites[i].alpha = level * 255 // FADE_STEPS
+
+    def draw(self):
+        if self.fade_levels.any():
+            self.sprites.draw()
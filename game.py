@@ -48,12 +48,15 @@ from user_interface.localization import LocalizationManager
 from utils.observer import Observed
 from utils.colors import BLACK, GREEN, RED, WHITE, rgb_to_rgba, YELLOW
 from utils.data_types import Viewport
+from utils.fixed_timestep import FixedTimestep
 from utils.functions import ignore_in_editor_mode
 from utils.game_logging import log_here, log_this_call
 from utils.timing import timer
 from utils.geometry import clamp, average_position_of_points_group, generate_2d_grid
+from utils.level_of_detail import SleepingEntities, UpdateLevelOfDetail
+from utils.instrumentation import Instrumentation, metrics
 from utils.improved_spritelists import (
-    LayeredSpriteList, SpriteListWithSwitch, UiSpriteList,
+    ChunkedSpriteList, LayeredSpriteList, SpriteListWithSwitch, UiSpriteList,
 )
 from utils.scheduling import EventsCreator, EventsScheduler
 from utils.views import LoadingScreen, LoadableWindowView, Updateable
@@ -117,7 +120,24 @@ class Settings:
         self.fps: int = 60
         self.game_speed: float = 1.0
         self.update_rate = 1 / (self.fps * self.game_speed)
+        # game logic ticks per second, Units are drawn interpolated between
+        # the ticks, so it can be lower than the fps:
+        self.simulation_rate: int = 60
+        # fast-forward running many ticks per frame, with visuals updated
+        # only in the last tick of the frame:
+        self.turbo_mode: bool = False
+        self.turbo_ticks_per_frame: int = 16
+        self.turbo_frame_budget: float = 1 / 30
         self.draw_fps_counter: bool = self.developer_mode and not self.editor_mode
+        # timing of the frame phases and counters drawn on the screen, F3 key
+        # toggles it during the game:
+        self.instrumentation: bool = False
+        # record timeline of the frames, F4 key dumps it to the Chrome trace
+        # file, and it is dumped automatically after each frame longer than
+        # trace_hitch_threshold seconds:
+        self.trace_recording: bool = False
+        self.trace_seconds: float = 10.0
+        self.trace_hitch_threshold: float = 0.1
 
         self.sound_on: bool = False
         self.music_on: bool = True
@@ -142,6 +162,15 @@ class Settings:
         self.unlimited_player_resources: bool = False
         self.unlimited_cpu_resources: bool = False
         self.fog_of_war: bool = True
+        self.line_of_sight: bool = True
+
+        # entities off-screen are updated less often, every N frames:
+        self.update_lod: bool = True
+        self.lod_reduced_interval: int = 3
+        self.lod_idle_interval: int = 8
+
+        # moving Units steer around each other instead of waiting and repathing:
+        self.local_avoidance: bool = True
 
         self.vehicles_threads: bool = True
         self.threads_fadeout_seconds: int = 2
@@ -198,6 +227,10 @@ class GameWindow(Window, EventsCreator):
         self.current_fps = 0
 
         self.settings = settings  # shared with Game
+        self.instrumentation = metrics
+        metrics.enabled = settings.instrumentation
+        if settings.trace_recording:
+            metrics.start_trace(settings.trace_seconds, settings.trace_hitch_threshold)
         self.resources_manager = ResourcesManager()
         self.localization_manager = LocalizationManager(default_language=settings.language)
         self.configs = read_csv_files('resources/configs')  # shared with Game
@@ -269,6 +302,7 @@ class GameWindow(Window, EventsCreator):
 
     # @timer(level=1, global_profiling_level=PROFILING_LEVEL, forced=False)
     def on_update(self, delta_time: float):
+        self.instrumentation.end_frame()
         self.frames += 1
         self.total_delta_time += delta_time
         self.current_fps = round(pyglet.clock.get_fps(), 2)  # round(1 / delta_time, 2)
@@ -281,11 +315,14 @@ class GameWindow(Window, EventsCreator):
 
     def on_draw(self):
         self.clear()
-        self.current_view.on_draw()
+        with self.instrumentation.span('draw'):
+            self.current_view.on_draw()
         if (cursor := self.mouse).visible:
             cursor.draw()
         if self.settings.draw_fps_counter:
             self.draw_current_fps_on_screen()
+        if self.instrumentation.enabled:
+            self.draw_instrumentation_overlay()
 
     def draw_current_fps_on_screen(self):
         draw_text(f'FPS: {self.current_fps}',
@@ -293,6 +330,19 @@ class GameWindow(Window, EventsCreator):
                   self.current_view.viewport[3] - 30,
                   GREEN if self.current_fps > 24 else YELLOW if self.current_fps > 20 else RED)
 
+    def dump_trace(self):
+        """Dump the recorded trace, or start recording it, if it was not recorded yet."""
+        if (trace := self.instrumentation.trace) is None:
+            self.instrumentation.start_trace(self.settings.trace_seconds, self.settings.trace_hitch_threshold)
+            log_here('Started recording trace of frames.', console=True)
+        else:
+            trace.dump(self.settings.trace_seconds)
+
+    def draw_instrumentation_overlay(self):
+        left, _, _, top = self.current_view.viewport
+        for i, line in enumerate(self.instrumentation.report(), start=2):
+            draw_text(line, left + 30, top - 30 * i, WHITE)
+
     def on_mouse_motion(self, x: float, y: float, dx: float, dy: float):
         if self.mouse.active:
             if self.current_view is self.game_view:
@@ -482,16 +532,19 @@ class GameWindow(Window, EventsCreator):
 
 
 class Timer:
+    """
+    Game time is counted in simulation ticks, not with the wall clock, so it
+    stops when game is paused and is the same on each run of the simulation.
+    """
 
     def __init__(self):
-        self.game_start_time = time.time()
         self.total_game_time = self.frames = self.seconds = self.minutes = self.hours = 0
         self.formatted_time = f'00:00:00'
 
-    def update(self):
-        self.total_game_time = seconds = time.time() - self.game_start_time
+    def update(self, tick_duration: float):
+        self.frames += 1  # simulation ticks
+        self.total_game_time = seconds = self.total_game_time + tick_duration
         gmtime = time.gmtime(seconds)
-        self.frames += 1
         self.seconds = s = gmtime.tm_sec
         self.minutes = m = gmtime.tm_min
         self.hours = h = gmtime.tm_hour
@@ -504,11 +557,10 @@ class Timer:
         draw_text(f"Time:{self.formatted_time}", x, y, GREEN, 15)
 
     def save(self):
-        self.total_game_time = time.time() - self.game_start_time
         return self
 
     def load(self):
-        self.game_start_time = time.time() - self.total_game_time
+        pass
 
 
 class ScenarioEditor:
@@ -531,20 +583,43 @@ class Game(LoadableWindowView, UiBundlesHandler, EventsCreator):
         self.assign_reference_to_self_for_all_classes()
 
         self.timer = Timer()
+        # game logic is updated in fixed ticks, decoupled from the frame rate:
+        self.fixed_timestep = FixedTimestep(self.settings)
         self.dialog: Optional[Tuple[str, Color, Color]] = None
 
+        # map chunks visible in the current viewport, shared by everything
+        # culling its drawing to the screen area:
+        self.viewport_chunks = ViewportChunks()
+        self.viewport_culling = ViewportCulling()
+
         # SpriteLists:
-        self.terrain_tiles = SpriteListWithSwitch(is_static=True, update_on=False)
+        self.terrain_tiles = ChunkedSpriteList(self.viewport_chunks, update_on=False)
         self.dead_bodies = SpriteListWithSwitch(is_static=True, update_on=False)
-        self.vehicles_threads = SpriteList(is_static=True)
+        self.vehicles_threads = VehicleThreadsLayer(self.settings)
         self.units_ordered_destinations = UnitsOrderedDestinations()
-        self.units = LayeredSpriteList(update_on=not self.editor_mode)
-        self.static_objects = SpriteListWithSwitch(is_static=True, update_on=False)
-        self.buildings = LayeredSpriteList(update_on=not self.editor_mode)
+        self.units = LayeredSpriteList(
+            update_on=not self.editor_mode, update_lod=UpdateLevelOfDetail(self.settings),
+            viewport_chunks=self.viewport_chunks
+        )
+        self.units_movement = UnitsMovement(local_avoidance=self.settings.local_avoidance)
+        self.combat = CombatResolver(self.settings)
+        self.sleeping_entities = SleepingEntities()
+        self.static_objects = ChunkedSpriteList(self.viewport_chunks, update_on=False)
+        self.buildings = LayeredSpriteList(
+            update_on=not self.editor_mode, update_lod=UpdateLevelOfDetail(self.settings),
+            viewport_chunks=self.viewport_chunks
+        )
         self.explosions_pool: Optional[ExplosionsPool] = ExplosionsPool(game=self)
         self.selection_markers_sprites = SpriteList()
         self.interface: UiSpriteList() = self.create_user_interface()
         self.set_updated_and_drawn_lists()
+        # layers updated only for the sake of visuals, skipped in the ticks
+        # fast-forwarded in the turbo mode:
+        self.visual_layers = (
+            self.interface, self.explosions_pool, self.vehicles_threads, self.selection_markers_sprites,
+            self.units_ordered_destinations
+        )
+        self.fast_forwarding = False
 
         self.events_scheduler = EventsScheduler(game=self)
 
@@ -608,6 +683,10 @@ class Game(LoadableWindowView, UiBundlesHandler, EventsCreator):
     def settings(self) -> Settings:
         return self.window.settings
 
+    @property
+    def instrumentation(self) -> Instrumentation:
+        return self.window.instrumentation
+
     @property
     def editor_mode(self) -> bool:
         return self.window.settings.editor_mode
@@ -1036,6 +1115,7 @@ class Game(LoadableWindowView, UiBundlesHandler, EventsCreator):
             self.buildings.append(gameobject)
         else:
             self.units.append(gameobject)
+        self.viewport_culling.add(gameobject)
 
     def attach_player_or_faction(self, attached: Union[Player, Faction]):
         if isinstance(attached, Player):
@@ -1056,6 +1136,7 @@ class Game(LoadableWindowView, UiBundlesHandler, EventsCreator):
             self.buildings.remove(gameobject)
         else:
             self.units.remove(gameobject)
+        self.viewport_culling.discard(gameobject)
 
     def detach_player_or_faction(self, detached: Union[Player, Faction]):
         if isinstance(detached, Player):
@@ -1067,14 +1148,66 @@ class Game(LoadableWindowView, UiBundlesHandler, EventsCreator):
         pass
 
     def update_view(self, delta_time):
+        fixed_timestep = self.fixed_timestep
+        turbo_mode = self.settings.turbo_mode
+        start = time.perf_counter()
+        ticks = fixed_timestep.advance(delta_time)
+        for tick in range(ticks):
+            self.set_fast_forwarding(turbo_mode and tick < ticks - 1)
+            self.update_simulation(fixed_timestep.tick_duration)
+        self.set_fast_forwarding(False)
+        if turbo_mode:
+            fixed_timestep.adjust_turbo(time.perf_counter() - start)
+        if not self.editor_mode:
+            self.units_movement.interpolate(fixed_timestep.interpolation)
+
+    def set_fast_forwarding(self, fast_forwarding: bool):
+        self.fast_forwarding = self.window.sound_player.effects_muted = fast_forwarding
+
+    def toggle_turbo_mode(self):
+        self.settings.turbo_mode = not self.settings.turbo_mode
+        self.fixed_timestep.turbo_ticks = 1
+
+    def update_simulation(self, tick_duration: float):
+        """
+        Advance the game logic by the single tick of the fixed duration, all
+        game time is counted in these ticks.
+        """
+        span = self.instrumentation.span
+        # sprites of the moving Units could be interpolated since the last tick:
+        self.units_movement.restore_positions()
         if not self.editor_mode and self.timer is not None:
-            self.timer.update()
-        for thing in (self.events_scheduler, self.fog_of_war, self.pathfinder, self.mini_map, self.current_scenario):
+            self.timer.update(tick_duration)
+        for name, thing in (('scheduler', self.events_scheduler), ('fog', self.fog_of_war),
+                            ('pathfinder', self.pathfinder), ('scenario', self.current_scenario)):
             if thing is not None:
-                thing.update()
-        super().update_view(delta_time)
+                with span(name):
+                    thing.update()
+        if not self.editor_mode:
+            with span('movement'):
+                self.units_movement.update(tick_duration)
+        if self.fast_forwarding:
+            updated = [o for o in self.updated if o not in self.visual_layers]
+        else:
+            updated = self.updated
+            if self.mini_map is not None:
+                with span('minimap'):
+                    self.mini_map.update()
+        for obj in updated:
+            with span('units' if obj is self.units else 'buildings' if obj is self.buildings else 'other'):
+                obj.on_update(tick_duration)
+        with span('combat'):
+            self.combat.resolve()
         self.update_local_drawn_units_and_buildings()
-        self.update_factions_and_players(delta_time)
+        with span('factions'):
+            self.update_factions_and_players(tick_duration)
+        if self.instrumentation.enabled:
+            self.count_updated_entities()
+
+    def count_updated_entities(self):
+        for entities in (self.units, self.buildings):
+            if entities.update_lod is not None:
+                self.instrumentation.count('entities updated', sum(entities.update_lod.updates_count))
 
     def after_loading(self):
         self.window.menu_view.update_ui_elements_from_variables()
@@ -1089,19 +1222,15 @@ class Game(LoadableWindowView, UiBundlesHandler, EventsCreator):
         self.update_interface_position(self.viewport[1], self.viewport[3])
 
     def save_timer(self) -> Timer:
-        """Before saving timer, recalculate total time game was played."""
-        self.timer.total_game_time = time.time() - self.timer.game_start_time
         return self.timer
 
     @log_this_call()
     def load_timer(self, loaded_timer: Timer):
         """
-        Subtract total time played from loading time to correctly reset timer
-        after loading game and continue time-counting from where it was stopped
-        last time.
+        Timer counts simulation ticks, so it continues from where it was
+        stopped without any correction.
         """
         self.timer = loaded_timer
-        self.timer.game_start_time = time.time() - self.timer.total_game_time
 
     def update_local_drawn_units_and_buildings(self):
         """
@@ -1122,7 +1251,14 @@ class Game(LoadableWindowView, UiBundlesHandler, EventsCreator):
 
     @timer(level=1, global_profiling_level=PROFILING_LEVEL)
     def on_draw(self):
+        self.viewport_chunks.update(self.viewport)
+        with self.instrumentation.span('culling'):
+            self.viewport_culling.update(
+                self.viewport, self.map.quadtree, self.factions, self.local_human_player.faction
+            )
         super().on_draw()
+        if self.instrumentation.enabled:
+            self.instrumentation.count('sprites drawn', self.count_drawn_sprites())
         if self.mini_map is not None and self.settings.show_minimap:
             self.mini_map.draw()
         self.timer.draw()
@@ -1134,6 +1270,12 @@ class Game(LoadableWindowView, UiBundlesHandler, EventsCreator):
         #     if unit.path:
         #         draw_text(f'{unit.path[-1]}',unit.right, unit.top, WHITE)
 
+    def count_drawn_sprites(self) -> int:
+        return sum(
+            obj.visible_sprites_count() if isinstance(obj, ChunkedSpriteList) else len(obj)
+            for obj in self.drawn if isinstance(obj, (SpriteList, ChunkedSpriteList))
+        )
+
     def draw_dialog(self, text: str, txt_color: Color = WHITE, color: Color = BLACK):
         x, y = self.window.screen_center
         draw_rectangle_filled(x, y, SCREEN_WIDTH, 200, rgb_to_rgba(color, 150))
@@ -1185,15 +1327,20 @@ if __name__ == '__main__':
         UnitsManager, SelectedEntityMarker, PermanentUnitsGroup
     )
     from effects.explosions import Explosion, ExplosionsPool
+    from effects.vehicles_threads import VehicleThreadsLayer
     from players_and_factions.player import (
         Faction, Player, CpuPlayer, PlayerEntity, HumanPlayer
     )
     from controllers.keyboard import KeyboardHandler
     from controllers.mouse import MouseCursor
     from units.units import Unit, UnitsOrderedDestinations, Engineer, Soldier, VehicleWithTurret
+    from units.movement import UnitsMovement
+    from units.combat import CombatResolver
     from gameobjects.gameobject import GameObject, TerrainObject, Wreck, Corpse
     from gameobjects.spawning import GameObjectsSpawner
     from map.fog_of_war import FogOfWar
+    from map.viewport_chunks import ViewportChunks
+    from map.viewport_culling import ViewportCulling
     from buildings.buildings import Building, ConstructionSite
     from campaigns.scenarios import Scenario, Campaign, load_campaigns, ScenarioDescriptor
     from campaigns.events import Victory, Defeat
@@ -2,20 +2,20 @@
 from __future__ import annotations
 
 from functools import cached_property
+from logging import DEBUG
 from typing import Optional, Union, Callable
 
-from PIL import Image
-
-from arcade import AnimatedTimeBasedSprite, load_texture, draw_rectangle_filled
+from arcade import AnimatedTimeBasedSprite, draw_rectangle_filled
 from arcade.arcade_types import Point
 
 from utils.constants import TILE_WIDTH, TILE_HEIGHT
 from utils.colors import GREEN, RED, add_transparency
 from utils.geometry import ROTATIONS
 from utils.observer import Observed, Observer
-from utils.functions import get_path_to_file, add_extension
+from utils.functions import add_extension
 from utils.game_logging import log_here
 from utils.improved_spritelists import LayeredSpriteList
+from utils.level_of_detail import UpdateTier
 from utils.scheduling import EventsCreator, ScheduledEvent
 
 
@@ -33,6 +33,9 @@ class GameObject(AnimatedTimeBasedSprite, EventsCreator, Observed):
     """
     game = None
     total_objects_count = 0
+    # if True, LayeredSpriteList calls draw() of this GameObject after drawing
+    # all its Sprites, e.g. to draw something over the Sprite:
+    drawn_separately = False
 
     def __init__(self, texture_name: str,
                  position: Point = (0, 0),
@@ -59,6 +62,8 @@ class GameObject(AnimatedTimeBasedSprite, EventsCreator, Observed):
 
         self.is_updated = True
         self.is_rendered = True
+        # time elapsed since the last update skipped by UpdateLevelOfDetail:
+        self.skipped_time = 0.0
 
         self.layered_spritelist: Optional[LayeredSpriteList] = None
 
@@ -87,15 +92,23 @@ class GameObject(AnimatedTimeBasedSprite, EventsCreator, Observed):
         return self.right > l and self.left < r and self.top > b and self.bottom < t
 
     def on_update(self, delta_time: float = 1 / 60):
-        self.position = [
-            self._position[0] + self.change_x * delta_time,
-            self._position[1] + self.change_y * delta_time
-        ]
+        self.update_position(delta_time)
         self.update_visibility()
 
-        if self.frames and self.is_rendered:
+        if self.frames and self.is_rendered and not self.game.fast_forwarding:
             self.update_animation(delta_time)
 
+    @property
+    def update_tier(self) -> UpdateTier:
+        return UpdateTier.FULL
+
+    def update_position(self, delta_time: float):
+        if self.change_x or self.change_y:
+            self.position = (
+                self._position[0] + self.change_x * delta_time,
+                self._position[1] + self.change_y * delta_time
+            )
+
     def update_visibility(self):
         if self.should_be_rendered:
             if not self.is_rendered:
@@ -130,7 +143,7 @@ class GameObject(AnimatedTimeBasedSprite, EventsCreator, Observed):
         pass
 
     def kill(self):
-        log_here(f'Destroying GameObject: {self}', True)
+        log_here('Destroying GameObject: %s', True, self, level=DEBUG)
         try:
             self.layered_spritelist.remove(self)
         except (AttributeError, ValueError):
@@ -157,11 +170,6 @@ class TerrainObject(GameObject):
             self.map_node.static_gameobject = self
         self.attach(observer=self.game)
 
-    def draw(self):
-        # TerrainObjects are not updated, so we need check here if to render
-        if self.on_screen:
-            super().draw()
-
     def kill(self):
         self.map_node.static_gameobject = None
         super().kill()
@@ -183,26 +191,52 @@ class Tree(TerrainObject):
 
 
 class Wreck(TerrainObject):
+    """
+    Wrecks and Corpses are spawned in large numbers when fights end, so they
+    are not discarded when their lifetime expires, but recycled by the
+    GameObjectsSpawner and respawned with a new id, position and texture.
+    """
 
     def __init__(self, filename: str, durability: int, position: Point, texture_index: Union[tuple, int]):
         super().__init__(filename, durability, position)
-        lifetime = self.game.settings.remove_wrecks_after_seconds
-        self.set_proper_wreck_texture(filename, texture_index)
-        self.schedule_event(ScheduledEvent(creator=self, delay=lifetime, function=self.kill))
+        self.durability = durability
+        self.set_proper_wreck_texture(texture_index)
+        self.schedule_expiration()
 
     def __repr__(self) -> str:
         return f'Wreck(id: {self.id})'
 
-    def set_proper_wreck_texture(self, name, texture_index):
-        texture_name = get_path_to_file(name)
-        width, height = Image.open(texture_name).size
+    def respawn(self, position: Point, texture_index: Union[tuple, int]):
+        GameObject.total_objects_count += 1
+        self.id = GameObject.total_objects_count
+        self.position = position
+        self.scheduled_events = []
+        self.map_node = self.game.map.position_to_node(*position)
+        if self.durability:
+            self.map_node.static_gameobject = self
+        self.set_proper_wreck_texture(texture_index)
+        self.attach(observer=self.game)
+        self.schedule_expiration()
+
+    def set_proper_wreck_texture(self, texture_index: Union[tuple, int]):
         try:  # for tanks with turrets
             i, j = texture_index  # Tuple
-            self.texture = load_texture(
-                texture_name, j * (width // ROTATIONS), i * (height // ROTATIONS), width // ROTATIONS, height // ROTATIONS)
+            self.texture = self.game.resources_manager.get_spritesheet(self.full_name, ROTATIONS, ROTATIONS)[i][j]
         except TypeError:
-            self.texture = load_texture(
-                texture_name, texture_index * (width // ROTATIONS), 0, width // ROTATIONS, height)
+            self.texture = self.game.resources_manager.get_spritesheet(self.full_name, columns=ROTATIONS)[0][texture_index]
+
+    def schedule_expiration(self):
+        lifetime = self.game.settings.remove_wrecks_after_seconds
+        self.schedule_event(ScheduledEvent(creator=self, delay=lifetime, function=self.expire, args=(self.id,)))
+
+    def expire(self, wreck_id: int):
+        # event scheduled before this Wreck was recycled must not kill it:
+        if wreck_id == self.id:
+            self.kill()
+
+    def kill(self):
+        super().kill()
+        self.game.spawner.recycle_wreck(self)
 
 
 class Corpse(Wreck):
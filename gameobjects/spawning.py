@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
-from typing import Any, Dict
+from collections import defaultdict
+from typing import Any, Dict, List, Union
 
 from arcade.arcade_types import Point
 
@@ -10,9 +11,14 @@ from players_and_factions.player import Player
 from units.units import *
 
 from utils.game_logging import log_here
+from utils.instrumentation import metrics
 from utils.constants import CLASS, TREE, CORPSE, WRECK, VEHICLE_WITH_TURRET, VEHICLE, SOLDIER, BUILDING, \
     RESEARCH_FACILITY, PRODUCED_RESOURCE, PRODUCED_UNITS, CONSTRUCTION_SITE
-from gameobjects.gameobject import GameObject, Wreck, Tree, Corpse
+from gameobjects.gameobject import GameObject, Wreck, Tree, Corpse, name_without_color
+from utils.geometry import ROTATIONS
+
+# how many killed Wrecks of each kind are kept to be reused:
+WRECKS_POOL_SIZE = 128
 
 
 class GameObjectsSpawner:
@@ -21,9 +27,16 @@ class GameObjectsSpawner:
     def __init__(self):
         self.pathfinder = self.game.pathfinder
         self.configs: Dict[str, Dict[str, Any]] = self.game.configs
+        # killed Wrecks and Corpses waiting to be respawned, by their texture name:
+        self.wrecks_pool: Dict[str, List[Wreck]] = defaultdict(list)
+        self.preload_wrecks_textures()
         log_here(f'GameObjectsSpawner was initialized successfully. Found {len(self.configs)} entities in config file.', console=True)
 
     def spawn(self, name: str, player: Player, position: Point, *args, **kwargs):
+        with metrics.span('spawn'):
+            return self._spawn(name, player, position, *args, **kwargs)
+
+    def _spawn(self, name: str, player: Player, position: Point, *args, **kwargs):
         if player is None:
             return self._spawn_terrain_object(name, position, *args, **kwargs)
         if CONSTRUCTION_SITE in name:
@@ -52,14 +65,36 @@ class GameObjectsSpawner:
                 setattr(spawned, key, value)
         return spawned
 
-    @staticmethod
-    def _spawn_terrain_object(name, position, *args, **kwargs) -> GameObject:
+    def preload_wrecks_textures(self):
+        """
+        Slice spritesheets of all Wrecks and Corpses during the loading, so
+        the Units dying in the middle of the battle do not do it.
+        """
+        resources_manager = self.game.resources_manager
+        for name in resources_manager.get('png'):
+            if name.endswith((f'_{WRECK}.png', f'_{CORPSE}.png')):
+                object_name = name_without_color(name.rsplit('_', 1)[0])
+                if self.configs.get(object_name, {}).get(CLASS) == VEHICLE_WITH_TURRET:
+                    resources_manager.get_spritesheet(name, ROTATIONS, ROTATIONS)
+                else:
+                    resources_manager.get_spritesheet(name, columns=ROTATIONS)
+
+    def _spawn_terrain_object(self, name, position, *args, **kwargs) -> GameObject:
         if WRECK in name:
-            texture_index = args[0]
-            return Wreck(name, 0 if CORPSE in name else 1, position, texture_index)
+            return self._spawn_wreck(Wreck, name, position, args[0])
         if CORPSE in name:
-            texture_index = args[0]
-            return Corpse(name, 0 if CORPSE in name else 1, position, texture_index)
+            return self._spawn_wreck(Corpse, name, position, args[0])
         if TREE in name:
             return Tree(name, 4, position)
         return GameObject(name, position=position)
+
+    def _spawn_wreck(self, wreck_class: type, name: str, position: Point, texture_index: Union[tuple, int]) -> Wreck:
+        if pooled := self.wrecks_pool[name]:
+            wreck = pooled.pop()
+            wreck.respawn(position, texture_index)
+            return wreck
+        return wreck_class(name, 0 if CORPSE in name else 1, position, texture_index)
+
+    def recycle_wreck(self, wreck: Wreck):
+        if len(pooled := self.wrecks_pool[wreck.full_name]) < WRECKS_POOL_SIZE:
+            pooled.append(wreck)
@@ -0,0 +1,405 @@
+#!/usr/bin/env python
+
+from functools import lru_cache
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from numba import njit
+
+from utils.data_types import FactionId, GridPosition
+from utils.geometry import precalculate_circular_area_matrix
+
+# visibility of the map is recalculated in square chunks of that many cells,
+# and only in the chunks where observers were added, moved or removed:
+FOG_CHUNK = 16
+
+# how many line-of-sight areas are kept in memory:
+SIGHT_CACHE_SIZE = 4096
+
+Rect = Tuple[int, int, int, int]  # left, right, bottom, top in map-grids
+
+# multipliers transforming coordinates of the first octant into the others:
+OCTANTS = np.array([
+    [1, 0, 0, -1, -1, 0, 0, 1],
+    [0, 1, -1, 0, 0, -1, 1, 0],
+    [0, 1, 1, 0, 0, -1, -1, 0],
+    [1, 0, 0, 1, -1, 0, 0, -1],
+], dtype=np.int64)
+
+
+@lru_cache()
+def disk_mask(radius: int) -> np.ndarray:
+    """
+    Square uint8 mask of side 2 * radius + 1 with ones on the cells observed
+    by an entity standing in its centre. Shape of the observed area is the
+    same as the one produced by precalculate_circular_area_matrix.
+    """
+    size = radius + radius + 1
+    mask = np.zeros((size, size), dtype=np.uint8)
+    for x, y in precalculate_circular_area_matrix(radius):
+        mask[x + radius, y + radius] = 1
+    mask.setflags(write=False)
+    return mask
+
+
+@lru_cache()
+def disk_delta_mask(radius: int, dx: int, dy: int) -> np.ndarray:
+    """
+    Difference between disk moved by (dx, dy) and the disk in the original
+    position, spanning the bounding box of both disks. Adding it to the
+    observers counts moves an observer in a single operation.
+    """
+    size = radius + radius + 1
+    delta = np.zeros((size + abs(dx), size + abs(dy)), dtype=np.int16)
+    old_x, old_y = max(-dx, 0), max(-dy, 0)
+    new_x, new_y = max(dx, 0), max(dy, 0)
+    delta[new_x:new_x + size, new_y:new_y + size] += disk_mask(radius)
+    delta[old_x:old_x + size, old_y:old_y + size] -= disk_mask(radius)
+    delta.setflags(write=False)
+    return delta
+
+
+def pack_mask(mask: np.ndarray) -> Dict:
+    """
+    Compress a binary mask for saving: pack it into bits, eight cells per
+    byte, and store the packed bytes as runs of (value, length), since
+    explored areas are made of large uniform patches.
+    """
+    packed = np.packbits(mask.ravel() != 0)
+    starts = np.flatnonzero(np.diff(packed, prepend=~packed[:1]))
+    lengths = np.diff(np.append(starts, packed.size))
+    return {
+        'shape': mask.shape,
+        'values': packed[starts].tobytes(),
+        'lengths': lengths.astype(np.uint32).tobytes(),
+    }
+
+
+def unpack_mask(data: Dict) -> np.ndarray:
+    shape = data['shape']
+    values = np.frombuffer(data['values'], dtype=np.uint8)
+    lengths = np.frombuffer(data['lengths'], dtype=np.uint32)
+    bits = np.unpackbits(np.repeat(values, lengths), count=shape[0] * shape[1])
+    return bits.reshape(shape)
+
+
+@njit(nogil=True, cache=True)
+def shadowcast(opacity: np.ndarray, gx: int, gy: int, radius: int, footprint: int, disk: np.ndarray) -> np.ndarray:
+    """
+    Find cells of the disk around (gx, gy) visible from its centre with the
+    recursive shadowcasting algorithm. Recursion is replaced with a stack of
+    scans waiting to be processed, since their order does not matter.
+
+    :param opacity: ndarray -- uint8 array of map size with ones on cells blocking sight
+    :param gx: int -- x coordinate of the observer
+    :param gy: int -- y coordinate of the observer
+    :param radius: int -- visibility radius in cells
+    :param footprint: int -- cells this close to the centre do not block sight
+    :param disk: ndarray -- result of the disk_mask(radius)
+    :return: ndarray -- uint8 mask of the same shape as disk
+    """
+    size = radius + radius + 1
+    columns, rows = opacity.shape
+    lit = np.zeros((size, size), dtype=np.uint8)
+    lit[radius, radius] = disk[radius, radius]
+    scans = np.empty((size * size + 1, 3), dtype=np.float64)  # row, start slope, end slope
+    for octant in range(8):
+        xx, xy, yx, yy = OCTANTS[0, octant], OCTANTS[1, octant], OCTANTS[2, octant], OCTANTS[3, octant]
+        scans[0, 0], scans[0, 1], scans[0, 2] = 1.0, 1.0, 0.0
+        waiting = 1
+        while waiting:
+            waiting -= 1
+            first_row, start, end = int(scans[waiting, 0]), scans[waiting, 1], scans[waiting, 2]
+            if start < end:
+                continue
+            new_start = 0.0
+            for j in range(first_row, radius + 1):
+                dx, dy = -j - 1, -j
+                blocked = False
+                while dx <= 0:
+                    dx += 1
+                    mx, my = dx * xx + dy * xy, dx * yx + dy * yy
+                    x, y = gx + mx, gy + my
+                    l_slope, r_slope = (dx - 0.5) / (dy + 0.5), (dx + 0.5) / (dy - 0.5)
+                    if start < r_slope:
+                        continue
+                    elif end > l_slope:
+                        break
+                    inside = 0 <= x < columns and 0 <= y < rows
+                    if inside:
+                        lit[mx + radius, my + radius] = disk[mx + radius, my + radius]
+                    opaque = not inside or (opacity[x, y] and max(abs(mx), abs(my)) > footprint)
+                    if blocked:
+                        if opaque:
+                            new_start = r_slope
+                            continue
+                        blocked = False
+                        start = new_start
+                    elif opaque and j < radius:
+                        blocked = True
+                        scans[waiting, 0], scans[waiting, 1], scans[waiting, 2] = j + 1, start, l_slope
+                        waiting += 1
+                        new_start = r_slope
+                if blocked:
+                    break
+    return lit
+
+
+@njit(nogil=True, fastmath=True, cache=True)
+def update_visibility(counts: np.ndarray,
+                      seen: np.ndarray,
+                      explored: np.ndarray,
+                      changed: np.ndarray,
+                      discovered: np.ndarray,
+                      rects: np.ndarray):
+    """
+    Recalculate visibility of the cells inside the (not overlapping) rects
+    from the observers counts in a single compiled pass.
+
+    :param rects: ndarray -- int array of (left, right, bottom, top) rows
+    """
+    for i in range(rects.shape[0]):
+        for x in range(rects[i, 0], rects[i, 1]):
+            for y in range(rects[i, 2], rects[i, 3]):
+                visible = 1 if counts[x, y] > 0 else 0
+                changed[x, y] = visible ^ seen[x, y]
+                discovered[x, y] = visible & (1 - explored[x, y])
+                explored[x, y] |= visible
+                seen[x, y] = visible
+
+
+class FogEngine:
+    """
+    Keeps visibility state of each Faction in arrays of map-grid size,
+    indexed [grid_x, grid_y]. Each cell holds the number of observers of the
+    Faction which see it, so adding, moving or removing an observer only
+    adds or subtracts its disk (or the difference of the old and new disk)
+    and static observers cost nothing after they were placed.
+
+    If the opacity array is provided, observers see only the part of their
+    disk which is not hidden behind opaque cells (line-of-sight mode). These
+    areas are cached for each position, radius and version of the opacity
+    of the map chunks around, and recalculated for the observers standing
+    nearby each time opacity of the map changes.
+
+    update() recalculates visibility only in the chunks of the map touched
+    since the previous update, merges it into the 'explored' array (running OR)
+    and finds cells which changed visibility (XOR), so FogOfWar can redraw
+    only these.
+    """
+
+    def __init__(self, columns: int, rows: int, opacity: Optional[np.ndarray] = None):
+        self.columns = columns
+        self.rows = rows
+        # cells blocking sight, or None if observers see their whole disks:
+        self.opacity = opacity
+        # incremented each time opacity of a cell inside the chunk changes:
+        self.opacity_versions = np.zeros(
+            ((columns + FOG_CHUNK - 1) // FOG_CHUNK, (rows + FOG_CHUNK - 1) // FOG_CHUNK), dtype=np.int64
+        )
+        self.sight_cache: Dict[Tuple[int, ...], np.ndarray] = {}
+        # number of observers seeing each cell:
+        self.counts: Dict[FactionId, np.ndarray] = {}
+        # cells which were visible after the last update:
+        self.seen: Dict[FactionId, np.ndarray] = {}
+        # all cells revealed to this moment:
+        self.explored: Dict[FactionId, np.ndarray] = {}
+        # cells which became visible or hidden during the last update:
+        self.changed: Dict[FactionId, np.ndarray] = {}
+        # cells which were revealed for the first time during the last update:
+        self.discovered: Dict[FactionId, np.ndarray] = {}
+        # areas recalculated during the last update, 'changed' and
+        # 'discovered' arrays are valid only inside them:
+        self.updated: Dict[FactionId, List[Rect]] = {}
+        # (column, row) of the chunks touched since the last update:
+        self.dirty: Dict[FactionId, Set[Tuple[int, int]]] = {}
+        # observer id -> [faction_id, grid_x, grid_y, radius, footprint, mask]
+        self.observers: Dict[Hashable, list] = {}
+
+    def add_faction(self, faction_id: FactionId):
+        if faction_id in self.counts:
+            return
+        shape = self.columns, self.rows
+        self.counts[faction_id] = np.zeros(shape, dtype=np.int16)
+        for arrays in (self.seen, self.explored, self.changed, self.discovered):
+            arrays.setdefault(faction_id, np.zeros(shape, dtype=np.uint8))
+        self.updated[faction_id] = []
+        self.dirty[faction_id] = set()
+
+    @property
+    def line_of_sight(self) -> bool:
+        return self.opacity is not None
+
+    def observed_area(self, gx: int, gy: int, radius: int, footprint: int = 0) -> np.ndarray:
+        if self.opacity is None:
+            return disk_mask(radius)
+        chunks = np.s_[max(gx - radius, 0) // FOG_CHUNK:(gx + radius) // FOG_CHUNK + 1,
+                       max(gy - radius, 0) // FOG_CHUNK:(gy + radius) // FOG_CHUNK + 1]
+        key = gx, gy, radius, footprint, int(self.opacity_versions[chunks].sum())
+        try:
+            return self.sight_cache[key]
+        except KeyError:
+            if len(self.sight_cache) >= SIGHT_CACHE_SIZE:
+                del self.sight_cache[next(iter(self.sight_cache))]
+            mask = shadowcast(self.opacity, gx, gy, radius, footprint, disk_mask(radius))
+            mask.setflags(write=False)
+            self.sight_cache[key] = mask
+            return mask
+
+    def add_observer(self, observer_id: Hashable, faction_id: FactionId, gx: int, gy: int, radius: int,
+                     footprint: int = 0):
+        """
+        :param footprint: int -- cells this close to the observer do not block
+        its sight, e.g. these occupied by the observing Building itself
+        """
+        if observer_id in self.observers:
+            self.remove_observer(observer_id)
+        self.add_faction(faction_id)
+        mask = self.observed_area(gx, gy, radius, footprint)
+        self.observers[observer_id] = [faction_id, gx, gy, radius, footprint, mask]
+        self._apply(faction_id, gx - radius, gy - radius, mask)
+
+    def move_observer(self, observer_id: Hashable, gx: int, gy: int):
+        observer = self.observers[observer_id]
+        faction_id, old_x, old_y, radius, footprint, old_mask = observer
+        dx, dy = gx - old_x, gy - old_y
+        if not (dx or dy):
+            return
+        observer[1], observer[2] = gx, gy
+        if self.opacity is None and abs(dx) <= radius and abs(dy) <= radius:
+            left, bottom = min(old_x, gx) - radius, min(old_y, gy) - radius
+            self._apply(faction_id, left, bottom, disk_delta_mask(radius, dx, dy))
+        else:
+            observer[5] = mask = self.observed_area(gx, gy, radius, footprint)
+            self._apply(faction_id, old_x - radius, old_y - radius, old_mask, subtract=True)
+            self._apply(faction_id, gx - radius, gy - radius, mask)
+
+    def remove_observer(self, observer_id: Hashable):
+        faction_id, gx, gy, radius, _, mask = self.observers.pop(observer_id)
+        self._apply(faction_id, gx - radius, gy - radius, mask, subtract=True)
+
+    def on_opacity_changed(self, grids: List[GridPosition]):
+        """
+        Call it after opacity of the cells changed, to invalidate cached sight
+        areas and refresh observers which could see these cells.
+        """
+        if self.opacity is None or not grids:
+            return
+        gxs, gys = np.array(grids, dtype=np.int64).T
+        changed_chunks = np.zeros(self.opacity_versions.shape, dtype=bool)
+        changed_chunks[gxs // FOG_CHUNK, gys // FOG_CHUNK] = True
+        self.opacity_versions[changed_chunks] += 1
+        for observer in self.observers.values():
+            faction_id, ox, oy, radius, footprint, old_mask = observer
+            if changed_chunks[max(ox - radius, 0) // FOG_CHUNK:(ox + radius) // FOG_CHUNK + 1,
+                              max(oy - radius, 0) // FOG_CHUNK:(oy + radius) // FOG_CHUNK + 1].any():
+                observer[5] = mask = self.observed_area(ox, oy, radius, footprint)
+                self._apply(faction_id, ox - radius, oy - radius, old_mask, subtract=True)
+                self._apply(faction_id, ox - radius, oy - radius, mask)
+
+    def _apply(self, faction_id: FactionId, left: int, bottom: int, mask: np.ndarray, subtract: bool = False):
+        """Add (or subtract) mask to the observers counts with its corner at (left, bottom)."""
+        width, height = mask.shape
+        x0, y0 = max(left, 0), max(bottom, 0)
+        x1, y1 = min(left + width, self.columns), min(bottom + height, self.rows)
+        if x0 >= x1 or y0 >= y1:
+            return
+        area = self.counts[faction_id][x0:x1, y0:y1]
+        clipped = mask[x0 - left:x1 - left, y0 - bottom:y1 - bottom]
+        if subtract:
+            np.subtract(area, clipped, out=area)
+        else:
+            np.add(area, clipped, out=area)
+        self.dirty[faction_id].update(
+            (column, row) for column in range(x0 // FOG_CHUNK, (x1 - 1) // FOG_CHUNK + 1)
+            for row in range(y0 // FOG_CHUNK, (y1 - 1) // FOG_CHUNK + 1)
+        )
+
+    def update(self):
+        for faction_id, counts in self.counts.items():
+            self.updated[faction_id] = updated = self._pop_dirty_rects(faction_id)
+            if updated:
+                update_visibility(counts, self.seen[faction_id], self.explored[faction_id],
+                                  self.changed[faction_id], self.discovered[faction_id],
+                                  np.array(updated, dtype=np.int64))
+
+    def _pop_dirty_rects(self, faction_id: FactionId) -> List[Rect]:
+        """Merge touched chunks lying next to each other in the same row into rects."""
+        dirty = self.dirty[faction_id]
+        rects = []
+        for column, row in sorted(dirty, key=lambda chunk: (chunk[1], chunk[0])):
+            left, bottom = column * FOG_CHUNK, row * FOG_CHUNK
+            right, top = min(left + FOG_CHUNK, self.columns), min(bottom + FOG_CHUNK, self.rows)
+            if rects and rects[-1][1] == left and rects[-1][2] == bottom:
+                rects[-1] = rects[-1][0], right, bottom, top
+            else:
+                rects.append((left, right, bottom, top))
+        dirty.clear()
+        return rects
+
+    def reveal_all(self, faction_id: FactionId):
+        self.add_faction(faction_id)
+        self.explored[faction_id].fill(1)
+        self.dirty[faction_id].update(np.ndindex(*self.opacity_versions.shape))
+
+    def revealed_grids(self, faction_id: FactionId) -> List[GridPosition]:
+        """Cells which became visible during the last update."""
+        if faction_id not in self.counts:
+            return []
+        changed, seen = self.changed[faction_id], self.seen[faction_id]
+        return self._to_grids(faction_id, lambda area: changed[area] & seen[area])
+
+    def concealed_grids(self, faction_id: FactionId) -> List[GridPosition]:
+        """Cells which were visible before the last update, but are not now."""
+        if faction_id not in self.counts:
+            return []
+        changed, seen = self.changed[faction_id], self.seen[faction_id]
+        return self._to_grids(faction_id, lambda area: changed[area] > seen[area])
+
+    def discovered_grids(self, faction_id: FactionId) -> List[GridPosition]:
+        """Cells which were explored for the first time during the last update."""
+        if faction_id not in self.counts:
+            return []
+        discovered = self.discovered[faction_id]
+        return self._to_grids(faction_id, lambda area: discovered[area])
+
+    def explored_grids(self, faction_id: FactionId) -> List[GridPosition]:
+        if faction_id not in self.explored:
+            return []
+        xs, ys = np.nonzero(self.explored[faction_id])
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def is_explored(self, faction_id: FactionId, gx: int, gy: int) -> bool:
+        if faction_id not in self.explored or not (0 <= gx < self.columns and 0 <= gy < self.rows):
+            return False
+        return bool(self.explored[faction_id][gx, gy])
+
+    def is_visible(self, faction_id: FactionId, gx: int, gy: int) -> bool:
+        if faction_id not in self.seen or not (0 <= gx < self.columns and 0 <= gy < self.rows):
+            return False
+        return bool(self.seen[faction_id][gx, gy])
+
+    def fully_explored(self, faction_id: FactionId) -> bool:
+        return faction_id in self.explored and bool(self.explored[faction_id].all())
+
+    def _to_grids(self, faction_id: FactionId, mask_of_area) -> List[GridPosition]:
+        grids = []
+        for x0, x1, y0, y1 in self.updated[faction_id]:
+            xs, ys = np.nonzero(mask_of_area(np.s_[x0:x1, y0:y1]))
+            grids.extend(zip((xs + x0).tolist(), (ys + y0).tolist()))
+        return grids
+
+    def save(self) -> Dict:
+        # observers register again after loading, so only the explored areas
+        # are worth saving:
+        return {
+            'columns': self.columns,
+            'rows': self.rows,
+            'explored': {faction_id: pack_mask(explored) for faction_id, explored in self.explored.items()},
+        }
+
+    def load(self, data: Dict):
+        for faction_id, packed in data['explored'].items():
+            self.explored[faction_id] = unpack_mask(packed)
+            self.add_faction(faction_id)
@@ -1,64 +1,68 @@
 #!/usr/bin/env python
 
-from functools import lru_cache
-from typing import Dict, KeysView, Optional, Set, Tuple
+from typing import Dict, KeysView, List, Optional
 
-from arcade import Sprite, SpriteList, make_soft_circle_texture
+import numpy as np
+
+from arcade.gl import CLAMP_TO_EDGE, LINEAR
+from arcade.gl.geometry import screen_rectangle
 
 from utils.colors import BLACK, FOG
-from utils.data_types import GridPosition
+from utils.data_types import FactionId, GridPosition
 from game import Game
-from utils.constants import TILE_WIDTH, TILE_HEIGHT
+from map.fog_engine import FogEngine
 from map.quadtree import Rect
+from map.viewport_chunks import CHUNK_SIZE
 
-OFFSET_X = TILE_WIDTH // 2
-OFFSET_Y = TILE_HEIGHT // 2
+# colors of the fog texels indexed by the visibility state of the map-grid:
+# 0 - unexplored, 1 - explored but not observed now, 2 - observed now
+FOG_PALETTE = np.array([(*BLACK[:3], 255), (*FOG[:3], 128), (0, 0, 0, 0)], dtype=np.uint8)
 
+FOG_VERTEX_SHADER = """
+#version 330
 
-DARK_TEXTURE = make_soft_circle_texture(3 * TILE_WIDTH, BLACK)
-FOG_TEXTURE = make_soft_circle_texture(3 * TILE_WIDTH, FOG, 128)
-FOG_SPRITELIST_SIZE = 60
+uniform Projection {
+    uniform mat4 matrix;
+} proj;
 
+in vec2 in_vert;
+in vec2 in_uv;
 
-class FogSprite(Sprite):
+out vec2 v_uv;
 
-    def __init__(self, position, texture):
-        super().__init__(center_x=position[0], center_y=position[1])
-        self.texture = texture
+void main() {
+    gl_Position = proj.matrix * vec4(in_vert, 0.0, 1.0);
+    v_uv = in_uv;
+}
+"""
 
+FOG_FRAGMENT_SHADER = """
+#version 330
 
-class FogSpritePool:
-    def __init__(self, size=100):
-        self.dark_pool = [FogSprite((0, 0), DARK_TEXTURE) for _ in range(size)]
-        self.fog_pool = [FogSprite((0, 0), FOG_TEXTURE) for _ in range(size)]
-        self.dark_available = self.dark_pool.copy()
-        self.fog_available = self.fog_pool.copy()
+uniform sampler2D fog;
 
-    def get_dark_sprite(self, position):
-        if not self.dark_available:
-            sprite = FogSprite(position, DARK_TEXTURE)
-        else:
-            sprite = self.dark_available.pop()
-            sprite.center_x, sprite.center_y = position
-        return sprite
+in vec2 v_uv;
 
-    def get_fog_sprite(self, position):
-        if not self.fog_available:
-            sprite = FogSprite(position, FOG_TEXTURE)
-        else:
-            sprite = self.fog_available.pop()
-            sprite.center_x, sprite.center_y = position
-        return sprite
+out vec4 f_color;
 
-    def return_sprite(self, sprite):
-        if sprite.texture == DARK_TEXTURE:
-            self.dark_available.append(sprite)
-        else:
-            self.fog_available.append(sprite)
+void main() {
+    f_color = texture(fog, v_uv);
+}
+"""
 
 
 class FogOfWar(Rect):
     """
+    Visibility of the map-grids is computed by the FogEngine for each Faction
+    separately, and this class draws the fog of the local human Player's
+    Faction as a single low-resolution texture with one texel per map-grid,
+    stretched over the whole map and smoothed by the GPU linear filtering.
+    Each frame only areas of texels which could change visibility are
+    uploaded, and only when they are inside the viewport chunks - uploads of
+    off-screen areas wait until Player scrolls the screen to them. With the
+    line_of_sight setting enabled, trees and buildings
+    block sight of the observers standing behind them.
+
     TODO: merge this class with MiniMap (they use same GridPosition set)
     """
     game: Optional[Game] = None
@@ -70,134 +74,122 @@ class FogOfWar(Rect):
         y = height // 2
         super().__init__(x, y, width, height)
 
-        self.fog_sprite_pool = FogSpritePool()
-
         # grid-data of the game-map:
         self.map_grids: KeysView[GridPosition] = self.game.map.nodes.keys()
-        # Tiles which have not been revealed yet:
-        self.unexplored: Set[GridPosition] = set([k for k in self.map_grids])
 
-        # Tiles revealed in this frame:
-        self.visible: Set[GridPosition] = set()
-        # All tiles revealed to this moment:
-        self.explored: Set[GridPosition] = set()
-
-        # Dict to find and manipulate Sprites in the spritelist:
-        self.grids_to_sprites: Dict[GridPosition, FogSprite] = {}
-        # Black or semi-transparent grey sprites are drawn_area on the screen
-        # width normal SpriteLists. We divide map for smaller areas with
-        # distinct spritelists to avoid updating too large sets each frame:
-        self.fog_sprite_lists = self.create_dark_sprites() if self.game.settings.fog_of_war else {}
+        # visible and explored grids of each Faction:
+        self.engine = FogEngine(self.game.map.columns, self.game.map.rows, self.map_opacity)
+        self.minimap_revealed = False
+
+        self.create_fog_texture()
+
+    def create_fog_texture(self):
+        columns, rows = self.engine.columns, self.engine.rows
+        ctx = self.game.window.ctx
+        self.texture = ctx.texture((columns, rows), components=4, filter=(LINEAR, LINEAR),
+                                   wrap_x=CLAMP_TO_EDGE, wrap_y=CLAMP_TO_EDGE)
+        self.program = ctx.program(vertex_shader=FOG_VERTEX_SHADER, fragment_shader=FOG_FRAGMENT_SHADER)
+        self.program['fog'] = 0
+        self.geometry = screen_rectangle(0, 0, self.game.map.width, self.game.map.height)
+        self.upload_texels(0, columns, 0, rows)
+        # map chunks which texels are outdated and wait for upload:
+        self.stale_chunks = np.zeros(
+            ((columns + CHUNK_SIZE - 1) // CHUNK_SIZE, (rows + CHUNK_SIZE - 1) // CHUNK_SIZE), dtype=bool
+        )
+
+    @property
+    def map_opacity(self) -> Optional[np.ndarray]:
+        return self.game.map.opacity if self.game.settings.line_of_sight else None
+
+    @property
+    def faction_id(self) -> Optional[FactionId]:
+        if (player := self.game.local_human_player) is not None:
+            return player.faction.id
 
     def in_bounds(self, item) -> bool:
         return self.left <= item[0] <= self.right and self.bottom <= item[1] <= self.top
 
-    def create_dark_sprites(self, forced: bool = False) -> Dict[Tuple[int, int], SpriteList]:
-        """
-        Fill whole map with black tiles representing unexplored, hidden area.
+    def add_observer(self, entity):
         """
-        cols, rows = self.game.map.columns // FOG_SPRITELIST_SIZE, self.game.map.rows // FOG_SPRITELIST_SIZE
-        get_dark_sprite = self.fog_sprite_pool.get_dark_sprite
-        sprite_lists = {}
-        for col in range(cols+1):
-            for row in range(rows+1):
-                sprite_lists[(col, row)] = SpriteList(is_static=True)
-        if (not self.game.editor_mode) or forced:
-            get_tile_position = self.get_tile_position
-            for x, y in self.unexplored:
-                sprite_list = sprite_lists[(x // FOG_SPRITELIST_SIZE, y // FOG_SPRITELIST_SIZE)]
-                # sprite = FogSprite(get_tile_position(x, y), DARK_TEXTURE)
-                sprite = get_dark_sprite(get_tile_position(x, y))
-                self.grids_to_sprites[(x, y)] = sprite
-                sprite_list.append(sprite)
-        return sprite_lists
-
-    def reveal_nodes(self, revealed: Set[GridPosition]):
+        Register PlayerEntity observing the map from its observed_grid. The
+        entity stays visible to its Faction until it is removed.
         """
-        Call this method from each PlayerEntity, which is observing map,
-        sending as param a set of GridPositions seen by the entity.
-        """
-        self.visible.update(revealed)
+        gx, gy = entity.observed_grid
+        self.engine.add_observer(
+            entity.id, entity.faction.id, gx, gy, entity.visibility_range, entity.observer_footprint
+        )
 
-    def update(self):
-        if not self.game.settings.fog_of_war:
-            self.game.mini_map.visible = self.unexplored.union(self.explored)
-            return
-        # remove currently visible tiles from the fog-of-war:
-        visible = self.visible
-        grids_to_sprites = self.grids_to_sprites
-        # since MiniMap also draws FoW, but the miniaturized version of, send
-        # set of GridPositions revealed this frame to the MiniMap instance:
-        self.game.mini_map.visible = revealed = visible.intersection(grids_to_sprites)
-        for grid in revealed:
-            sprite_list = self.fog_sprite_lists[(grid[0] // FOG_SPRITELIST_SIZE, grid[1] // FOG_SPRITELIST_SIZE)]
-            sprite_list.remove(grids_to_sprites[grid])
-            del grids_to_sprites[grid]
-        # add grey-semi-transparent fog to the tiles which are no longer seen:
-        fog = self.explored - visible
-        get_tile_position = self.get_tile_position
-        get_fog_sprite = self.fog_sprite_pool.get_fog_sprite
-        for grid_x, grid_y in fog.difference(grids_to_sprites):
-            x, y = get_tile_position(grid_x, grid_y)
-            grids_to_sprites[(grid_x, grid_y)] = sprite = get_fog_sprite((x, y))  #  FogSprite((x, y), FOG_TEXTURE)
-            sprite_list = self.fog_sprite_lists[(grid_x // FOG_SPRITELIST_SIZE, grid_y // FOG_SPRITELIST_SIZE)]
-            sprite_list.append(sprite)
-        self.explored.update(visible)
-        self.unexplored.difference_update(visible)
-        self.visible.clear()
-
-    @staticmethod
-    @lru_cache()
-    def get_tile_position(x, y):
-        return x * TILE_WIDTH + OFFSET_X, y * TILE_HEIGHT + OFFSET_Y
-
-    # def draw(self):
-    #     if self.game.editor_mode:
-    #         return
-    #     left, right, bottom, top = self.game.viewport
-    #     screen_width, screen_height = left - right, top - bottom
-    #
-    #     for grid, sprite_list in self.fog_sprite_lists.items():
-    #         s_left, s_right = grid[0] * screen_width, (grid[0] + 1) * screen_width
-    #         s_bottom, s_top = grid[1] * screen_height, (grid[1] + 1) * screen_height
-    #         if (left < s_right or right > s_left) and (bottom < s_top or top > s_bottom):
-    #             sprite_list.draw()
+    def move_observer(self, entity):
+        self.engine.move_observer(entity.id, *entity.observed_grid)
 
-    def draw(self):
-        if self.game.editor_mode:
-            return
+    def remove_observer(self, entity):
+        self.engine.remove_observer(entity.id)
 
-        left, right, bottom, top = self.game.viewport
+    def is_explored(self, grid: GridPosition) -> bool:
+        return self.engine.is_explored(self.faction_id, *grid)
 
-        # Pre-calculate which grid cells are visible in the viewport
-        visible_grids = self._get_visible_grid_cells(left, right, bottom, top)
+    def map_revealed(self) -> bool:
+        return self.engine.fully_explored(self.faction_id)
 
-        # Only draw those sprite lists
-        for grid in visible_grids:
-            if grid in self.fog_sprite_lists:
-                self.fog_sprite_lists[grid].draw()
+    def explored_grids(self) -> List[GridPosition]:
+        return self.engine.explored_grids(self.faction_id)
 
-    def _get_visible_grid_cells(self, left, right, bottom, top):
-        # Calculate which grid cells are within the viewport
-        # This could be cached if viewport hasn't changed
-        screen_width, screen_height = left - right, top - bottom
+    def update(self):
+        if opacity_changes := self.game.map.opacity_changes:
+            self.engine.on_opacity_changed(opacity_changes)
+            opacity_changes.clear()
+        if not self.game.settings.fog_of_war:
+            if not self.minimap_revealed:
+                self.game.mini_map.visible = set(self.map_grids)
+                self.minimap_revealed = True
+            return
+        self.minimap_revealed = False
+        self.engine.update()
+        if (faction_id := self.faction_id) is None or faction_id not in self.engine.updated:
+            return
+        for left, right, bottom, top in self.engine.updated[faction_id]:
+            self.stale_chunks[
+                left // CHUNK_SIZE:(right - 1) // CHUNK_SIZE + 1, bottom // CHUNK_SIZE:(top - 1) // CHUNK_SIZE + 1
+            ] = True
+        # since MiniMap also draws FoW, but the miniaturized version of, send
+        # set of GridPositions explored this frame to the MiniMap instance:
+        self.game.mini_map.visible = set(self.engine.discovered_grids(faction_id))
 
-        min_x = max(0, int(left / screen_width) - 1)
-        max_x = min(int(self.game.map.columns // FOG_SPRITELIST_SIZE), int(right / screen_width) + 1)
-        min_y = max(0, int(bottom / screen_height) - 1)
-        max_y = min(int(self.game.map.rows // FOG_SPRITELIST_SIZE), int(top / screen_height) + 1)
+    def upload_visible_texels(self):
+        left, right, bottom, top = (max(bound, 0) for bound in self.game.viewport_chunks.bounds)
+        visible = self.stale_chunks[left:right, bottom:top]
+        if not visible.any():
+            return
+        columns = np.flatnonzero(visible.any(axis=1))
+        rows = np.flatnonzero(visible.any(axis=0))
+        right, top = left + int(columns[-1]) + 1, bottom + int(rows[-1]) + 1
+        left, bottom = left + int(columns[0]), bottom + int(rows[0])
+        self.stale_chunks[left:right, bottom:top] = False
+        self.upload_texels(
+            left * CHUNK_SIZE, min(right * CHUNK_SIZE, self.engine.columns),
+            bottom * CHUNK_SIZE, min(top * CHUNK_SIZE, self.engine.rows)
+        )
+
+    def upload_texels(self, left: int, right: int, bottom: int, top: int):
+        state = np.zeros((right - left, top - bottom), dtype=np.uint8)
+        if (faction_id := self.faction_id) in self.engine.explored:
+            state += self.engine.explored[faction_id][left:right, bottom:top]
+            state += self.engine.seen[faction_id][left:right, bottom:top]
+        # fog arrays are indexed [x, y], but texture data is stored row by row:
+        texels = FOG_PALETTE[state.T]
+        self.texture.write(texels.tobytes(), viewport=(left, bottom, right - left, top - bottom))
 
-        return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+    def draw(self):
+        if self.game.editor_mode or not self.game.settings.fog_of_war:
+            return
+        self.upload_visible_texels()
+        self.texture.use(0)
+        self.geometry.render(self.program)
 
-    def __getstate__(self) -> Dict:
-        saved_fow = self.__dict__.copy()
-        del saved_fow['map_grids']
-        del saved_fow['grids_to_sprites']
-        del saved_fow['fog_sprite_lists']
-        return saved_fow
+    def save(self) -> Dict:
+        return self.engine.save()
 
-    def __setstate__(self, state):
-        self.__dict__.update(state)
-        self.map_grids = self.game.map.nodes.keys()
-        self.grids_to_sprites = {}
-        self.fog_sprite_lists = self.create_dark_sprites()
+    def load(self, data: Dict):
+        """Restore explored areas of the Factions saved with the save() method."""
+        self.engine.load(data)
+        self.upload_texels(0, self.engine.columns, 0, self.engine.rows)
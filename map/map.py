@@ -12,6 +12,8 @@ from typing import (
     Deque, Dict, List, Optional, Set, Tuple, Union, Generator, Collection, Any,
 )
 
+import numpy as np
+
 from arcade import Sprite, Texture, load_spritesheet, make_soft_square_texture
 
 from game import PROFILING_LEVEL
@@ -27,6 +29,7 @@ from utils.functions import (
 )
 from map.quadtree import CartesianQuadTree
 from utils.game_logging import log_here, log_this_call
+from utils.instrumentation import metrics
 from utils.timing import timer
 from utils.geometry import calculate_circular_area
 
@@ -196,6 +199,15 @@ class Map:
         self.nodes: Dict[GridPosition, MapNode] = {}
         self.distances = {}
 
+        # map-grids blocking line of sight (trees and buildings), indexed
+        # [x, y], and grids which opacity changed since the FogOfWar checked:
+        self.opacity = np.zeros((self.columns, self.rows), dtype=np.uint8)
+        self.opacity_changes: List[GridPosition] = []
+        # map-grids which Units can not drive through, regardless of other
+        # Units, indexed [x, y], used by the UnitsMovement local avoidance:
+        self.obstacles = np.zeros((self.columns, self.rows), dtype=np.uint8)
+        self.game.units_movement.obstacles = self.obstacles
+
         self.quadtree = CartesianQuadTree(self.width // 2, self.height // 2, self.width, self.height)
         log_here(f'Generated QuadTree of depth: {self.quadtree.total_depth()}', console=True)
 
@@ -223,6 +235,19 @@ class Map:
         return {grid: random.randrange(1, trees) for grid, node in self.nodes.items()
                 if random.random() < self.game.settings.percent_chance_for_spawning_tree and node not in forbidden}
 
+    def update_opacity(self, node: MapNode):
+        if node.grid not in self.nodes:
+            return  # nonexistent_node
+        opaque = node.tree is not None or node.building is not None
+        if self.opacity[node.grid] != opaque:
+            self.opacity[node.grid] = opaque
+            self.opacity_changes.append(node.grid)
+
+    def update_obstacles(self, node: MapNode):
+        if node.grid not in self.nodes:
+            return  # nonexistent_node
+        self.obstacles[node.grid] = not (node.terrain_type is TerrainType.GROUND and node.is_pathable)
+
     def save(self) -> Dict:
         return {
             'rows': self.rows,
@@ -290,6 +315,7 @@ class Map:
             for y in range(rows):
                 terrain = TerrainType.VOID if x in(0, columns) or y in (0, rows) else TerrainType.GROUND
                 self.nodes[(x, y)] = node = MapNode(x, y, terrain)
+                self.update_obstacles(node)
                 self.create_map_sprite(*node.position, node.terrain_type)
         log_here(f'Generated {len(self.nodes)} map nodes.', console=True)
 
@@ -400,6 +426,8 @@ class MapNode:
     @tree.setter
     def tree(self, value: Optional[TreeID]):
         self._static_gameobject = self._tree = value
+        self.map.update_opacity(self)
+        self.map.update_obstacles(self)
 
     def remove_tree(self):
         if self._tree is not None:
@@ -422,6 +450,8 @@ class MapNode:
     @building.setter
     def building(self, value: Optional[Building]):
         self._static_gameobject = self._building = value
+        self.map.update_opacity(self)
+        self.map.update_obstacles(self)
 
     @property
     def unit_or_building(self) -> Optional[Union[Unit, Building]]:
@@ -434,6 +464,7 @@ class MapNode:
     @static_gameobject.setter
     def static_gameobject(self, value: Optional[GameObject, TreeID]):
         self._static_gameobject = value
+        self.map.update_obstacles(self)
 
     @property
     def is_water(self) -> bool:
@@ -455,13 +486,14 @@ class MapNode:
     @is_pathable.setter
     def is_pathable(self, value: bool):
         self._pathable = value
+        self.map.update_obstacles(self)
 
     @property
     def available_for_construction(self) -> bool:
         return self.is_walkable and self.is_explored()  # and not self.are_buildings_nearby()
 
     def is_explored(self):
-        return self.map.game.editor_mode or self.grid in self.map.game.fog_of_war.explored
+        return self.map.game.editor_mode or self.map.game.fog_of_war.is_explored(self.grid)
 
     def are_buildings_nearby(self):
         return any(n.building for n in self.adjacent_nodes)
@@ -703,11 +735,14 @@ class Pathfinder(EventsCreator):
         if successful, return the path, else enqueue the request again.
         """
         unit, start, destination = self.requests_for_paths.pop()
+        self.map.game.instrumentation.count('path requests')
         # to avoid infinite attempts to find path to the Node blocked by
         # other Unit from the same navigating groups pathfinding to the
         # same place TODO: find a better way to not mutually-block nodes
         if self.map.grid_to_node(destination).is_walkable:
-            if path := a_star(self.map, start, destination):
+            with metrics.span('a_star'):
+                path = a_star(self.map, start, destination)
+            if path:
                 return unit.follow_new_path(path)
         self.request_path(unit, start, destination)
 
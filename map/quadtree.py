@@ -5,9 +5,8 @@ from __future__ import annotations
 from abc import abstractmethod, ABC
 from math import dist
 from typing import Optional
-from matplotlib import path as mpltPath
 from collections import defaultdict
-from numpy import array
+from numpy import abs as np_abs, array, ndarray
 
 from arcade import draw_rectangle_outline, draw_text, draw_polygon_outline
 
@@ -32,28 +31,57 @@ class Rect:
                 self.left <= item.position[0] <= self.right and self.bottom <= item.position[1] <= self.top
         )
 
+    def contains_points(self, xs: ndarray, ys: ndarray) -> ndarray:
+        """Vectorised version of in_bounds returning boolean mask for arrays of x and y coordinates."""
+        return (self.left <= xs) & (xs <= self.right) & (self.bottom <= ys) & (ys <= self.top)
+
     def intersects(self, other):
-        return not ((other.right < self.left or self.right < other.left) and
-                    (other.top < self.bottom or self.top < other.bottom))
+        return not (other.right < self.left or self.right < other.left or
+                    other.top < self.bottom or self.top < other.bottom)
 
     def draw(self):
         draw_rectangle_outline(*self.position, self.width, self.height, RED)
 
 
 class IsometricRect(Rect):
+    """
+    Diamond-shaped area used by the isometric map. Instead of testing points
+    against a polygon, coordinates are projected onto the diamond's rotated
+    axes u = dx + 2dy and v = dx - 2dy, where the diamond becomes a square of
+    half-size equal to half of its width, so containment is just two
+    comparisons, which are also easy to vectorise with numpy.
+    """
+    __slots__ = ('half_width', 'half_height', 'u', 'v', 'points')
 
     def __init__(self, cx, cy, width, height):
         super().__init__(cx, cy, width, height)
         x, y = self.cx, self.cy
-        hh, hw = self.width // 4, self.width // 2
+        self.half_width = hw = self.width / 2
+        self.half_height = hh = self.width / 4
+        self.u, self.v = x + 2 * y, x - 2 * y
         self.points = [(x - hw, y), (x, y + hh), (x + hw, y), (x, y - hh), (x - hw, y)]
-        self.polygon = mpltPath.Path(array(self.points))
+
+    def contains_point(self, x, y) -> bool:
+        dx, dy = x - self.cx, 2 * (y - self.cy)
+        return abs(dx + dy) <= self.half_width and abs(dx - dy) <= self.half_width
 
     def in_bounds(self, item) -> bool:
-        return self.polygon.contains_point(item.position)
+        return self.contains_point(*item.position)
+
+    def contains_points(self, xs: ndarray, ys: ndarray) -> ndarray:
+        dx, dy = xs - self.cx, 2 * (ys - self.cy)
+        return (np_abs(dx + dy) <= self.half_width) & (np_abs(dx - dy) <= self.half_width)
 
     def intersects(self, other) -> bool:
-        return any(self.polygon.contains_point(point) for point in other.points)
+        if isinstance(other, IsometricRect):
+            # both diamonds are axis-aligned squares in the rotated (u, v) space:
+            reach = self.half_width + other.half_width
+            return abs(self.u - other.u) <= reach and abs(self.v - other.v) <= reach
+        # the point of the cartesian rectangle closest to the diamond centre
+        # (in the diamond's metric) is simply the clamped centre:
+        x = min(max(self.cx, other.left), other.right)
+        y = min(max(self.cy, other.bottom), other.top)
+        return self.contains_point(x, y)
 
     def draw(self):
         draw_polygon_outline(self.points, RED, 1)
@@ -258,7 +286,7 @@ class IsometricQuadTree(QuadTree, IsometricRect):
         return f'QuadTree(depth: {self.depth}, l:{self.left}, r:{self.right}, b:{self.bottom}, t:{self.top})'
 
     def insert(self, entity) -> Optional[IsometricQuadTree]:
-        if not Rect.in_bounds(self, entity):
+        if not self.in_bounds(entity):
             return None
 
         if self.entities_count < self.max_entities:
@@ -297,25 +325,37 @@ class IsometricQuadTree(QuadTree, IsometricRect):
     def divide(self):
         cx, cy = self.cx, self.cy
         half_width, half_height = self.width / 2, self.height / 2
-        quart_width, quart_height = half_width / 2, half_height / 2
+        quart_width, quart_height = self.half_width / 2, self.half_height / 2
         new_depth = self.depth + 1
         self.children = [
-            CartesianQuadTree(cx - quart_width, cy, half_width, half_height, self.max_entities, new_depth),
-            CartesianQuadTree(cx, cy + quart_height, half_width, half_height, self.max_entities, new_depth),
-            CartesianQuadTree(cx + quart_width, cy, half_width, half_height, self.max_entities, new_depth),
-            CartesianQuadTree(cx, cy - quart_height, half_width, half_height, self.max_entities, new_depth)
+            IsometricQuadTree(cx - quart_width, cy, half_width, half_height, self.max_entities, new_depth),
+            IsometricQuadTree(cx, cy + quart_height, half_width, half_height, self.max_entities, new_depth),
+            IsometricQuadTree(cx + quart_width, cy, half_width, half_height, self.max_entities, new_depth),
+            IsometricQuadTree(cx, cy - quart_height, half_width, half_height, self.max_entities, new_depth)
         ]
 
     def query(self, hostile_factions_ids, bounds, found_entities):
-        """Find the points in the quadtree that lie within boundary."""
+        """
+        Find the points in the quadtree that lie within boundary. Candidates
+        from all intersecting nodes are gathered first and then tested
+        against the bounds in a single vectorised call.
+        """
+        candidates = self.collect_candidates(hostile_factions_ids, bounds, [])
+        if candidates:
+            xs, ys = array([e.position for e in candidates], dtype=float).T
+            mask = bounds.contains_points(xs, ys)
+            found_entities.extend(e for e, inside in zip(candidates, mask) if inside)
+        return found_entities
+
+    def collect_candidates(self, hostile_factions_ids, bounds, candidates):
         if not self.intersects(bounds):
-            return found_entities
+            return candidates
         for faction_id, entities in self.entities.items():
             if faction_id in hostile_factions_ids:
-                found_entities.extend(e for e in entities if bounds.is_inside_map_grid(e))
+                candidates.extend(entities)
         for quadtree in self.children:
-            found_entities = quadtree.query(hostile_factions_ids, bounds, found_entities)
-        return found_entities
+            candidates = quadtree.collect_candidates(hostile_factions_ids, bounds, candidates)
+        return candidates
 
     def find_visible_entities_in_circle(self, circle_x, circle_y, radius, hostile_factions_ids):
         diameter = radius + radius
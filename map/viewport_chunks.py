@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+from typing import Optional, Set, Tuple
+
+from utils.constants import TILE_WIDTH, TILE_HEIGHT
+from utils.data_types import Number, Viewport
+
+# size of the square chunk of the map, counted in map-grids:
+CHUNK_SIZE = 16
+CHUNK_WIDTH = CHUNK_SIZE * TILE_WIDTH
+CHUNK_HEIGHT = CHUNK_SIZE * TILE_HEIGHT
+
+# sprites are often bigger than their map-grids (e.g. trees), so the area
+# checked for visible chunks is extended by this margin (in pixels):
+VIEWPORT_MARGIN = 2 * TILE_HEIGHT
+
+ChunkPosition = Tuple[int, int]
+ChunkBounds = Tuple[int, int, int, int]  # left, right, bottom, top, excluding right and top
+
+
+def position_to_chunk(x: Number, y: Number) -> ChunkPosition:
+    return int(x // CHUNK_WIDTH), int(y // CHUNK_HEIGHT)
+
+
+class ViewportChunks:
+    """
+    Divides the map into square chunks of CHUNK_SIZE map-grids and keeps
+    track of the chunks overlapping the current viewport. Call update() once
+    per frame before anything is drawn, and use 'visible' or 'bounds' to
+    skip drawing or uploading content of the chunks which are off-screen.
+    """
+
+    def __init__(self):
+        self.viewport: Optional[Viewport] = None
+        self.bounds: ChunkBounds = 0, 0, 0, 0
+        self.visible: Set[ChunkPosition] = set()
+        # True if the set of visible chunks changed in the last update:
+        self.changed = False
+
+    def update(self, viewport: Viewport):
+        if viewport == self.viewport:
+            self.changed = False
+            return
+        self.viewport = viewport
+        left, right, bottom, top = viewport
+        left, bottom = position_to_chunk(left - VIEWPORT_MARGIN, bottom - VIEWPORT_MARGIN)
+        right, top = position_to_chunk(right + VIEWPORT_MARGIN, top + VIEWPORT_MARGIN)
+        bounds = left, right + 1, bottom, top + 1
+        self.changed = bounds != self.bounds
+        if self.changed:
+            self.bounds = bounds
+            self.visible = {(x, y) for x in range(left, right + 1) for y in range(bottom, top + 1)}
+
+    def __contains__(self, chunk: ChunkPosition) -> bool:
+        return chunk in self.visible
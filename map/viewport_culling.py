@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+from typing import Set
+
+from map.quadtree import CartesianQuadTree, Rect
+from map.viewport_chunks import VIEWPORT_MARGIN
+from utils.data_types import Viewport
+
+
+class ViewportCulling:
+    """
+    Decides which PlayerEntities are rendered. Once per frame, the map QuadTree
+    is queried with the viewport rectangle, extended by VIEWPORT_MARGIN, and
+    the entities found there, which belong to the local Player's Faction or
+    are known to it, are rendered. Only entities which entered or left this
+    set since the last frame start or stop rendering, so the cost depends on
+    the number of entities on the screen, not on the number of all entities.
+
+    Entities attached to the Game are hidden, until the first update finds
+    them on the screen.
+    """
+
+    def __init__(self):
+        self.rendered: Set = set()
+
+    def add(self, entity):
+        entity.stop_rendering()
+
+    def discard(self, entity):
+        self.rendered.discard(entity)
+
+    def update(self, viewport: Viewport, quadtree: CartesianQuadTree, factions_ids, local_faction):
+        left, right, bottom, top = viewport
+        bounds = Rect(
+            (left + right) / 2, (bottom + top) / 2,
+            right - left + 2 * VIEWPORT_MARGIN, top - bottom + 2 * VIEWPORT_MARGIN
+        )
+        if local_faction is None:
+            rendered = set()
+        else:
+            known_enemies = local_faction.known_enemies
+            rendered = {
+                entity for entity in quadtree.query(factions_ids, bounds, [])
+                if entity.faction is local_faction or entity in known_enemies
+            }
+        for entity in self.rendered - rendered:
+            entity.stop_rendering()
+        for entity in rendered - self.rendered:
+            entity.start_rendering()
+        self.rendered = rendered
@@ -20,7 +20,7 @@ def read_csv_files(configs_path: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
         try:
             configs.update(read_single_file(file))
         except Exception as e:
-            log_here(f'{str(e)}')
+            log_here(f'{str(e)}', exc_info=True)
     return configs
 
 
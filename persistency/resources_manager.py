@@ -1,8 +1,10 @@
 import os
 import pathlib
-from typing import Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
-from utils.functions import find_paths_to_all_files_of_type
+from arcade import Texture, load_textures
+
+from utils.functions import find_paths_to_all_files_of_type, get_texture_size
 from utils.game_logging import log_here
 
 
@@ -11,6 +13,9 @@ class ResourcesManager:
     This class finds paths to all audio files and textures used in game and caches them in internal dict for easy and
     fast access. Later on instead of searching a texture each time, when a new GameObject is instantiated, its
     constructor just query this manager for the proper path to the file.
+
+    Spritesheets of the GameObjects are sliced into Textures also once, and these Textures are shared by all
+    instances using the same spritesheet.
     """
 
     def __init__(self, extensions: tuple[str] = ('png', 'wav'), resources_path: Optional[str] = None):
@@ -21,6 +26,7 @@ class ResourcesManager:
             names_to_paths = find_paths_to_all_files_of_type(extension, self.resources_path)
             self.resources[extension] = {name: pathlib.Path(path, name) for name, path in names_to_paths.items()}
         log_here(f'ResourceManager found {sum(len(paths) for paths in self.resources.values())} files.', console=True)
+        self.spritesheets: Dict[Tuple[str, int, int], List[List[Texture]]] = {}
 
     def get(self, file_name_or_extension: str) -> Union[str, dict[str, str]]:
         """
@@ -43,3 +49,19 @@ class ResourcesManager:
             return self.resources[extension]
         except KeyError:
             raise FileNotFoundError(f'There are no files with {extension} extensions in {self.resources_path}!')
+
+    def get_spritesheet(self, file_name: str, rows: int = 1, columns: int = 1) -> List[List[Texture]]:
+        """
+        Return Textures sliced from the spritesheet of equally-sized frames, as a list of rows, each containing list
+        of Textures of this row. Returned lists are shared, do not modify them.
+        """
+        try:
+            return self.spritesheets[file_name, rows, columns]
+        except KeyError:
+            path = self.get(file_name)
+            width, height = get_texture_size(file_name, rows, columns)
+            self.spritesheets[file_name, rows, columns] = spritesheet = [
+                load_textures(path, [(i * width, j * height, width, height) for i in range(columns)])
+                for j in range(rows)
+            ]
+            return spritesheet
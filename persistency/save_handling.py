@@ -10,9 +10,11 @@ from PIL import Image
 from utils.constants import CONSTRUCTION_SITE
 from utils.functions import find_paths_to_all_files_of_type
 from utils.game_logging import log_here, log_this_call
+from utils.instrumentation import metrics
 from utils.data_types import SavedGames
 from players_and_factions.player import Faction
 from map.map import Map, Pathfinder
+from map.fog_of_war import FogOfWar
 from user_interface.minimap import MiniMap
 from gameobjects.spawning import GameObjectsSpawner
 from effects.explosions import ExplosionsPool
@@ -110,7 +112,8 @@ class SaveManager:
 
     def save_game(self, save_name: str, game: 'Game'):
         finished = game.window.menu_view.get_bundle('scenario editor menu').find_by_name('finished').ticked
-        self._save_data_to_file(save_name, game, self.saves_path, SAVE_EXTENSION, finished)
+        with metrics.span('save'):
+            self._save_data_to_file(save_name, game, self.saves_path, SAVE_EXTENSION, finished)
         log_here(f'Game saved successfully as: {save_name}', True)
 
     def _save_data_to_file(self, save_name: str, game: 'Game', path: str, extension: str, finished: bool = False):
@@ -131,9 +134,7 @@ class SaveManager:
             file['scenario_miniature'] = game.mini_map.create_minimap_texture()
             file['scenario'] = game.current_scenario
             file['permanent_units_groups'] = game.units_manager.permanent_units_groups
-            if game.editor_mode and finished:
-                game.fog_of_war.create_dark_sprites(forced=True)
-            file['fog_of_war'] = game.fog_of_war
+            file['fog_of_war'] = game.fog_of_war.save()
             file['mini_map'] = game.mini_map.save()
             file['scheduled_events'] = self.game.events_scheduler.save()
         if os.name == 'nt':
@@ -211,14 +212,6 @@ class SaveManager:
 
     def load_settings(self, settings):
         self.window.settings.__dict__.update(settings.__dict__)
-        # recalculating rendering layers is required since settings changed and
-        # LayeredSpriteList instances where instantiated with settings values
-        # from the menu, not from the loaded file
-        for spritelist in self.game.updated:
-            try:
-                spritelist.rendering_layers = spritelist.create_rendering_layers()
-            except AttributeError:
-                pass
 
     def load_viewports(self, viewports):
         self.game.viewport = viewports[0]
@@ -267,8 +260,12 @@ class SaveManager:
             for unit in group:
                 unit.set_permanent_units_group(group_id)
 
-    def load_fog_of_war(self, fog_of_war):
-        self.game.fog_of_war = fog_of_war
+    def load_fog_of_war(self, fog_of_war: Dict):
+        self.game.fog_of_war = FogOfWar()
+        if isinstance(fog_of_war, dict):
+            self.game.fog_of_war.load(fog_of_war)
+        else:  # older saves pickled the whole FogOfWar object
+            log_here('Saved fog of war is in obsolete format, explored areas were not restored.', console=True)
 
     def load_mini_map(self, minimap):
         self.game.mini_map = MiniMap(minimap, loaded=True)
@@ -289,7 +286,7 @@ class SaveManager:
                 os.remove(paths[file_name])
                 del paths[file_name]
             except Exception as e:
-                log_here(f'{str(e)}', console=True)
+                log_here(f'{str(e)}', console=True, exc_info=True)
 
     def rename_saved_game(self, old_name: str, new_name: str):
         try:
@@ -298,7 +295,7 @@ class SaveManager:
             self.saved_games[new_name] = new
             del self.saved_games[old_name]
         except Exception as e:
-            log_here(f'{str(e)}', console=True)
+            log_here(f'{str(e)}', console=True, exc_info=True)
 
 
 # these imports are placed here to avoid circular-imports issue:
@@ -7,6 +7,7 @@ from math import dist
 from abc import abstractmethod
 from collections import defaultdict
 from functools import cached_property
+from logging import DEBUG
 from typing import Dict, List, Optional, Set, Tuple, Union, Any, Callable
 
 from arcade.arcade_types import Color, Point
@@ -17,7 +18,7 @@ from utils.constants import CONSTRUCTION_SITE, TILE_WIDTH, FUEL, FOOD, AMMUNITIO
     UI_RESOURCES_SECTION
 
 from gameobjects.gameobject import GameObject
-from map.map import MapNode, position_to_map_grid
+from map.map import MapNode
 from campaigns.research import Technology
 from utils.game_logging import log_here
 from utils.observer import Observed, Observer
@@ -27,9 +28,8 @@ from utils.data_types import FactionId, TechnologyId, GridPosition
 from utils.functions import (
     ignore_in_editor_mode, add_player_color_to_name
 )
-from utils.geometry import (
-    clamp, find_area, precalculate_circular_area_matrix
-)
+from utils.geometry import clamp
+from utils.level_of_detail import UpdateTier, select_update_tier
 from utils.scheduling import EventsCreator, ScheduledEvent
 
 
@@ -426,7 +426,7 @@ class CpuPlayer(Player):
         """
         if self.game.settings.ai_sleep:
             return
-        log_here(f'Updating CPU logic of player: {self}')
+        log_here('Updating CPU logic of player: %s', False, self, level=DEBUG)
         if self.construction_priorities:
             self.build_unit_or_building()
         else:
@@ -507,6 +507,9 @@ class PlayerEntity(GameObject):
         # this enemy is currently targeted, can be obtained automatically:
         self._targeted_enemy: Optional[PlayerEntity] = None
 
+        # sleeping entity does not update its logic until it is woken up:
+        self.is_sleeping = False
+
         self.selection_marker: Optional[SelectedEntityMarker] = None
 
         # this is checked so frequent that it is worth caching it:
@@ -522,15 +525,17 @@ class PlayerEntity(GameObject):
         self.quadtree: Optional[QuadTree] = None
         self.insert_to_map_quadtree()
 
-        # visibility matrix is a list of tuples containing (x, y) indices to be
-        # later used in updating current visibility area by adding to the
-        # matrix current position
-        self.visibility_radius = value = self.configs['visibility_radius'] * TILE_WIDTH
-        self.visibility_matrix = precalculate_circular_area_matrix(value // TILE_WIDTH)
+        # visibility range is the radius of the area revealed by this entity,
+        # counted in map-grids, around the grid it observes from:
+        self.visibility_range: int = int(self.configs['visibility_radius'])
+        self.visibility_radius = self.visibility_range * TILE_WIDTH
 
-        # area inside which all map-nodes are visible for this entity:
-        self.observed_grids: Set[GridPosition] = set()
-        self.observed_nodes: Set[MapNode] = set()
+        # map-grid from which this entity observes the map, None if it is not
+        # registered as an observer in the FogOfWar:
+        self.observed_grid: Optional[GridPosition] = None
+        # distance (in map-grids) around observed_grid within which trees and
+        # buildings do not block line of sight, e.g. the entity's own nodes:
+        self.observer_footprint = 0
 
         # like the visibility matrix, but range should be smaller:
         self.attack_radius = self.configs['attack_radius'] * TILE_WIDTH
@@ -618,6 +623,8 @@ class PlayerEntity(GameObject):
 
     def assign_enemy(self, enemy: Optional[PlayerEntity]):
         # used when Player orders this Entity to attack the particular enemy
+        if enemy is not None:
+            self.wake_up()
         self._enemy_assigned_by_player = self._targeted_enemy = enemy
 
     @property
@@ -638,16 +645,36 @@ class PlayerEntity(GameObject):
         raise NotImplementedError
 
     def on_update(self, delta_time: float = 1/60):
-        if self.is_controlled_by_human_player and self.game.settings.fog_of_war:
-            self.game.fog_of_war.reveal_nodes(self.observed_grids)
         self.update_known_enemies_set()
         if self.known_enemies or self._enemy_assigned_by_player:
             self.update_battle_behaviour()
         super().on_update(delta_time)
 
+    def update_visibility(self):
+        pass  # PlayerEntities are started and stopped being rendered by the ViewportCulling
+
+    @property
+    def can_sleep(self) -> bool:
+        return not (self.known_enemies or self._enemy_assigned_by_player)
+
+    def fall_asleep(self):
+        self.is_sleeping = True
+        self.game.sleeping_entities.add(self)
+
+    def wake_up(self):
+        if self.is_sleeping:
+            self.is_sleeping = False
+            self.game.sleeping_entities.discard(self)
+
     @property
-    def should_be_rendered(self) -> bool:
-        return self.on_screen and self in self.game.local_drawn_units_and_buildings
+    def update_tier(self) -> UpdateTier:
+        return select_update_tier(
+            self.is_rendered or self.known_enemies or self._enemy_assigned_by_player, self.is_travelling
+        )
+
+    @property
+    def is_travelling(self) -> bool:
+        return self.is_moving
 
     def update_in_map_quadtree(self):
         self.remove_from_map_quadtree()
@@ -662,16 +689,24 @@ class PlayerEntity(GameObject):
     @abstractmethod
     def update_observed_area(self, *args, **kwargs):
         """
-        Find which MapNodes are inside visibility radius of this Entity and
-        update accordingly visible area on the map and reveal Fog of War.
-        Units and Building implement this method in different way.
+        Update the map-grid from which this Entity observes the map, and which
+        is used as the centre of the area revealed in the Fog of War. Units
+        and Building implement this method in different way.
         """
         raise NotImplementedError
 
-    def calculate_observed_area(self) -> Set[GridPosition]:
-        gx, gy = position_to_map_grid(*self.position)
-        circular_map_grid_area = find_area(gx, gy, self.visibility_matrix)
-        return self.map.is_inside_map_grid(circular_map_grid_area)
+    def start_observing(self, grid: GridPosition):
+        self.observed_grid = grid
+        self.game.fog_of_war.add_observer(self)
+
+    def move_observed_grid(self, grid: GridPosition):
+        self.observed_grid = grid
+        self.game.fog_of_war.move_observer(self)
+
+    def stop_observing(self):
+        if self.observed_grid is not None:
+            self.game.fog_of_war.remove_observer(self)
+            self.observed_grid = None
 
     @ignore_in_editor_mode
     def update_known_enemies_set(self):
@@ -713,9 +748,7 @@ class PlayerEntity(GameObject):
     def attack(self, enemy):
         if self.ammunition:
             for weapon in (w for w in self._weapons if w.reloaded()):
-                damage = weapon.shoot(enemy)
-                self.experience += round(damage / weapon.damage, 2)
-            self.check_if_enemy_destroyed(enemy)
+                weapon.shoot(enemy)
 
     def check_if_enemy_destroyed(self, enemy: PlayerEntity):
         if not enemy.is_alive:
@@ -740,25 +773,10 @@ class PlayerEntity(GameObject):
     def is_damaged(self) -> bool:
         return self._health < self._max_health
 
-    def on_being_damaged(self, damage: float, penetration: float = 0) -> float:
-        """
-        :param damage: float -- damage dealt by the attacker
-        :param penetration: float -- value of attacker's weapon penetration
-        :return: bool -- if hit entity was destroyed/killed or not,
-        it is propagated to the damage-dealer.
-        """
-        if self.player.immortal:
-            return 0.0
-        final_damage = self.calculate_final_damage(damage, penetration)
+    def receive_damage(self, final_damage: float):
+        self.wake_up()
         self.health -= final_damage
         self.check_if_should_entity_die()
-        return final_damage
-
-    def calculate_final_damage(self, damage: float, penetration: float) -> float:
-        deviation = self.game.settings.damage_randomness_factor
-        effectiveness = 1 - max(self.armour - penetration, 0)
-        final_damage = random.gauss(damage, deviation) * effectiveness
-        return final_damage
 
     def check_if_should_entity_die(self):
         if self._health <= 0:
@@ -770,8 +788,10 @@ class PlayerEntity(GameObject):
         if self.is_selected:  # and self.player is self.game.local_human_player
             self.game.units_manager.unselect(self)
         self.known_enemies.clear()
+        self.wake_up()
         if self.quadtree is not None:
             self.remove_from_map_quadtree()
+        self.stop_observing()
         super().kill()
 
     def save(self) -> Dict:
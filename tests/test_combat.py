@@ -0,0 +1,102 @@
+from unittest import TestCase, main
+
+from map.viewport_chunks import CHUNK_HEIGHT
+from units.combat import CombatResolver
+
+
+class Settings:
+    damage_randomness_factor = 0.0
+
+
+class Player:
+    immortal = False
+
+
+class Entity:
+
+    def __init__(self, health: float = 100.0, position=(100, 100)):
+        self.player = Player()
+        self.position = position
+        self.health = health
+        self.experience = 0.0
+        self.cover = 0
+        self.armour = 0
+        self.is_building = False
+        self.is_moving = False
+        self.is_infantry = False
+        self.damage_received = []
+        self.enemies_destroyed = 0
+
+    @property
+    def is_alive(self) -> bool:
+        return self.health > 0
+
+    def receive_damage(self, final_damage: float):
+        self.damage_received.append(final_damage)
+        self.health -= final_damage
+
+    def check_if_enemy_destroyed(self, enemy):
+        self.enemies_destroyed += not enemy.is_alive
+
+
+class Weapon:
+
+    def __init__(self, owner: Entity, accuracy: float = 200.0, shot_sound: str = 'rifle.wav'):
+        self.owner = owner
+        self.accuracy = accuracy
+        self.damage = 10.0
+        self.penetration = 0.0
+        self.shot_sound = shot_sound
+        self.effects_created = 0
+
+    def create_shot_audio_visual_effects(self):
+        self.effects_created += 1
+
+
+class TestCombatResolver(TestCase):
+
+    def setUp(self) -> None:
+        self.combat = CombatResolver(Settings(), seed=0)
+
+    def tearDown(self) -> None:
+        self.combat = None
+
+    def test_damage_is_summed_and_applied_once_per_target(self):
+        target = Entity(health=25.0)
+        shooters = [Entity() for _ in range(3)]
+        for shooter in shooters:
+            self.combat.add_shot(Weapon(shooter), target)
+        self.combat.resolve()
+        self.assertEqual([30.0], target.damage_received)
+        self.assertEqual(0, len(self.combat))
+        self.assertEqual([1, 1, 1], [s.enemies_destroyed for s in shooters])
+        self.assertEqual([1.0, 1.0, 1.0], [s.experience for s in shooters])
+
+    def test_missed_shots_and_immortal_targets_deal_no_damage(self):
+        target, immortal = Entity(), Entity()
+        immortal.player.immortal = True
+        self.combat.add_shot(Weapon(Entity(), accuracy=-200.0), target)
+        self.combat.add_shot(Weapon(Entity()), immortal)
+        self.combat.resolve()
+        self.assertEqual([], target.damage_received)
+        self.assertEqual([0.0], immortal.damage_received)
+
+    def test_shot_effects_are_created_once_per_sound(self):
+        target = Entity(health=1000.0)
+        weapons = [Weapon(Entity()) for _ in range(4)] + [Weapon(Entity(), shot_sound='tank.wav')]
+        for weapon in weapons:
+            self.combat.add_shot(weapon, target)
+        self.combat.resolve()
+        self.assertEqual(2, sum(w.effects_created for w in weapons))
+
+    def test_same_shots_fired_far_apart_are_all_heard(self):
+        target = Entity(health=1000.0)
+        weapons = [Weapon(Entity()), Weapon(Entity()), Weapon(Entity(position=(100, CHUNK_HEIGHT * 3)))]
+        for weapon in weapons:
+            self.combat.add_shot(weapon, target)
+        self.combat.resolve()
+        self.assertEqual([1, 0, 1], [w.effects_created for w in weapons])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+from unittest import TestCase, main
+
+from utils.fixed_timestep import FixedTimestep
+
+
+class Settings:
+    simulation_rate = 20
+    turbo_mode = False
+    turbo_ticks_per_frame = 4
+    turbo_frame_budget = 0.03
+
+
+class TestFixedTimestep(TestCase):
+
+    def setUp(self) -> None:
+        self.settings = Settings()
+        self.timestep = FixedTimestep(self.settings)
+
+    def tearDown(self) -> None:
+        self.timestep = None
+
+    def test_ticks_are_independent_of_frame_rate(self):
+        ticks = [self.timestep.advance(1 / 60) for _ in range(60)]
+        self.assertEqual(20, sum(ticks))
+        self.assertEqual({0, 1}, set(ticks))
+
+    def test_interpolation_is_fraction_of_tick_left(self):
+        self.assertEqual(1, self.timestep.advance(0.075))
+        self.assertAlmostEqual(0.5, self.timestep.interpolation)
+
+    def test_long_frame_drops_surplus_time(self):
+        self.assertEqual(5, self.timestep.advance(10.0))
+        self.assertAlmostEqual(0.0, self.timestep.accumulator)
+        self.assertEqual(5, self.timestep.ticks)
+
+
+    def test_turbo_mode_runs_ticks_within_budget(self):
+        self.settings.turbo_mode = True
+        ticks = []
+        for _ in range(5):
+            ticks.append(self.timestep.advance(1 / 60))
+            self.timestep.adjust_turbo(elapsed=0.001)
+        self.assertEqual([1, 2, 3, 4, 4], ticks)
+        self.timestep.adjust_turbo(elapsed=0.06)
+        self.assertEqual(2, self.timestep.advance(1 / 60))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from map.fog_engine import FogEngine, pack_mask, unpack_mask
+from utils.geometry import find_area, precalculate_circular_area_matrix
+
+
+class TestFogEngine(TestCase):
+
+    def setUp(self) -> None:
+        self.engine = FogEngine(columns=50, rows=40)
+
+    def tearDown(self) -> None:
+        self.engine = None
+
+    def expected_area(self, gx, gy, radius):
+        area = find_area(gx, gy, precalculate_circular_area_matrix(radius))
+        return {(x, y) for (x, y) in area if 0 <= x < 50 and 0 <= y < 40}
+
+    def test_observer_reveals_disk(self):
+        self.engine.add_observer(1, 2, 10, 10, 5)
+        self.engine.update()
+        expected = self.expected_area(10, 10, 5)
+        self.assertEqual(expected, set(self.engine.revealed_grids(2)))
+        self.assertEqual(expected, set(self.engine.explored_grids(2)))
+        self.assertEqual(expected, set(self.engine.discovered_grids(2)))
+        self.assertEqual([], self.engine.revealed_grids(4))
+
+    def test_observer_disk_is_clipped_to_map_edges(self):
+        self.engine.add_observer(1, 2, 0, 39, 6)
+        self.engine.update()
+        self.assertEqual(self.expected_area(0, 39, 6), set(self.engine.explored_grids(2)))
+        self.assertFalse(self.engine.is_explored(2, -1, 39))
+
+    def test_explored_area_persists_when_observer_leaves(self):
+        self.engine.add_observer(1, 2, 10, 10, 3)
+        self.engine.update()
+        self.engine.move_observer(1, 30, 10)
+        self.engine.update()
+        self.assertEqual(self.expected_area(10, 10, 3), set(self.engine.concealed_grids(2)))
+        self.assertEqual(self.expected_area(30, 10, 3), set(self.engine.discovered_grids(2)))
+        self.assertTrue(self.engine.is_explored(2, 10, 10))
+        self.assertFalse(self.engine.is_visible(2, 10, 10))
+        self.assertTrue(self.engine.is_visible(2, 30, 10))
+
+    def test_moving_observer_step_by_step_matches_fresh_disk(self):
+        self.engine.add_observer(1, 2, 5, 5, 4)
+        for gx, gy in ((6, 5), (7, 6), (7, 7), (6, 8), (5, 7)):
+            self.engine.move_observer(1, gx, gy)
+        self.engine.update()
+        visible = {(x, y) for (x, y) in self.engine.explored_grids(2) if self.engine.is_visible(2, x, y)}
+        self.assertEqual(self.expected_area(5, 7, 4), visible)
+        self.assertTrue(np.all(self.engine.counts[2] >= 0))
+
+    def test_overlapping_observers_are_counted(self):
+        self.engine.add_observer(1, 2, 10, 10, 4)
+        self.engine.add_observer(2, 2, 12, 10, 4)
+        self.engine.update()
+        self.engine.remove_observer(1)
+        self.engine.update()
+        self.assertTrue(self.engine.is_visible(2, 12, 10))
+        self.assertFalse(self.engine.is_visible(2, 6, 10))
+        self.assertEqual(self.expected_area(10, 10, 4) - self.expected_area(12, 10, 4),
+                         set(self.engine.concealed_grids(2)))
+
+    def test_unchanged_visibility_produces_no_changes(self):
+        self.engine.add_observer(1, 2, 10, 10, 3)
+        self.engine.update()
+        self.engine.update()
+        self.assertEqual([], self.engine.revealed_grids(2))
+        self.assertEqual([], self.engine.concealed_grids(2))
+        self.assertEqual([], self.engine.discovered_grids(2))
+        self.assertEqual([], self.engine.updated[2])
+
+    def test_fully_explored(self):
+        self.assertFalse(self.engine.fully_explored(2))
+        self.engine.reveal_all(2)
+        self.assertTrue(self.engine.fully_explored(2))
+        self.engine.update()
+        self.assertEqual([(0, 50, 0, 16), (0, 50, 16, 32), (0, 50, 32, 40)], self.engine.updated[2])
+
+    def test_saved_explored_areas_are_restored(self):
+        self.engine.add_observer(1, 2, 10, 10, 5)
+        self.engine.add_observer(2, 4, 45, 3, 7)
+        self.engine.update()
+        loaded = FogEngine(columns=50, rows=40)
+        loaded.load(self.engine.save())
+        for faction_id in (2, 4):
+            self.assertTrue(np.array_equal(self.engine.explored[faction_id], loaded.explored[faction_id]))
+        self.assertEqual([], loaded.revealed_grids(2))
+
+    def test_packed_mask_round_trip(self):
+        for mask in (np.zeros((7, 5), np.uint8), np.ones((64, 48), np.uint8),
+                     np.random.default_rng(3).integers(0, 2, (33, 17), dtype=np.uint8)):
+            self.assertTrue(np.array_equal(mask, unpack_mask(pack_mask(mask))))
+        self.assertEqual(1, len(pack_mask(np.ones((64, 48), np.uint8))['values']))
+
+
+class TestLineOfSight(TestCase):
+
+    def setUp(self) -> None:
+        self.opacity = np.zeros((50, 40), dtype=np.uint8)
+        self.engine = FogEngine(columns=50, rows=40, opacity=self.opacity)
+
+    def tearDown(self) -> None:
+        self.engine = None
+
+    def test_open_field_reveals_whole_disk(self):
+        self.engine.add_observer(1, 2, 20, 20, 5)
+        self.engine.update()
+        expected = find_area(20, 20, precalculate_circular_area_matrix(5))
+        self.assertEqual(set(expected), set(self.engine.explored_grids(2)))
+
+    def test_wall_blocks_sight(self):
+        self.opacity[22, 15:26] = 1
+        self.engine.add_observer(1, 2, 20, 20, 6)
+        self.engine.update()
+        self.assertTrue(self.engine.is_visible(2, 22, 20))
+        self.assertFalse(self.engine.is_visible(2, 24, 20))
+        self.assertTrue(self.engine.is_visible(2, 17, 20))
+
+    def test_footprint_does_not_block_sight(self):
+        self.opacity[19:22, 19:22] = 1
+        self.engine.add_observer(1, 2, 20, 20, 6, footprint=1)
+        self.engine.update()
+        self.assertTrue(self.engine.is_visible(2, 24, 20))
+
+    def test_opacity_change_refreshes_observers(self):
+        self.engine.add_observer(1, 2, 20, 20, 6)
+        self.engine.update()
+        self.assertTrue(self.engine.is_visible(2, 24, 20))
+        self.opacity[22, 15:26] = 1
+        self.engine.on_opacity_changed([(22, y) for y in range(15, 26)])
+        self.engine.update()
+        self.assertFalse(self.engine.is_visible(2, 24, 20))
+        self.assertIn((24, 20), self.engine.concealed_grids(2))
+
+    def test_opacity_change_skips_distant_observers(self):
+        self.engine.add_observer(1, 2, 5, 5, 4)
+        self.engine.update()
+        mask = self.engine.observers[1][5]
+        self.opacity[40, 30:35] = 1
+        self.engine.on_opacity_changed([(40, y) for y in range(30, 35)])
+        self.assertIs(mask, self.engine.observers[1][5])
+        self.engine.update()
+        self.assertEqual([], self.engine.updated[2])
+
+    def test_sight_areas_are_cached(self):
+        self.engine.add_observer(1, 2, 20, 20, 5)
+        self.engine.add_observer(2, 2, 20, 20, 5)
+        self.assertIs(self.engine.observers[1][5], self.engine.observers[2][5])
+        self.engine.move_observer(1, 21, 20)
+        self.engine.move_observer(1, 20, 20)
+        self.assertEqual(2, len(self.engine.sight_cache))
+        self.assertIs(self.engine.observers[1][5], self.engine.observers[2][5])
+
+
+if __name__ == '__main__':
+    main()
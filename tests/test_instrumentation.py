@@ -0,0 +1,60 @@
+from time import sleep
+from unittest import TestCase, main
+
+from utils.instrumentation import Instrumentation, DISABLED_SPAN, HISTORY_SIZE
+
+
+class TestInstrumentation(TestCase):
+
+    def setUp(self) -> None:
+        self.instrumentation = Instrumentation()
+
+    def tearDown(self) -> None:
+        self.instrumentation = None
+
+    def test_disabled_instrumentation_records_nothing(self):
+        self.assertIs(DISABLED_SPAN, self.instrumentation.span('units'))
+        self.instrumentation.count('path requests')
+        self.instrumentation.end_frame()
+        self.assertEqual([], self.instrumentation.report())
+
+    def test_spans_and_counters_are_recorded_per_frame(self):
+        self.instrumentation.toggle()
+        for frame in range(HISTORY_SIZE + 10):
+            for _ in range(2):
+                with self.instrumentation.span('units'):
+                    self.instrumentation.count('entities updated', 5)
+            self.instrumentation.end_frame()
+        span = self.instrumentation.spans['units']
+        mean, p95, maximum = span.statistics(self.instrumentation.frames)
+        self.assertTrue(0 < mean <= maximum)
+        self.assertEqual(0.0, span.current)
+        self.assertEqual({'entities updated': 10}, self.instrumentation.last_frame_counters)
+        self.assertEqual(2, len(self.instrumentation.report()))
+
+    def test_trace_records_spans_and_frames(self):
+        self.instrumentation.start_trace(trace_seconds=10.0, hitch_threshold=60.0)
+        with self.instrumentation.span('a_star'):
+            pass
+        self.instrumentation.end_frame()
+        events = self.instrumentation.trace.events(seconds=10.0)
+        self.assertEqual(['a_star', 'frame'], [event['name'] for event in events])
+        self.assertTrue(all(event['ph'] == 'X' and event['dur'] >= 0 for event in events))
+        self.instrumentation.stop_trace()
+        self.assertIs(DISABLED_SPAN, self.instrumentation.span('a_star'))
+
+    def test_reentered_span_records_each_interval(self):
+        self.instrumentation.start_trace(trace_seconds=10.0, hitch_threshold=60.0)
+        span = self.instrumentation.span('spawn')
+        with span:
+            with span:
+                sleep(0.01)
+            sleep(0.01)
+        outer, inner = sorted(self.instrumentation.trace.events(seconds=10.0), key=lambda event: -event['dur'])
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertGreaterEqual(outer['dur'] - inner['dur'], 0.01 * 1e6)
+        self.assertAlmostEqual(outer['dur'] / 1e6, span.current)
+
+
+if __name__ == '__main__':
+    main()
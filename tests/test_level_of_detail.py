@@ -0,0 +1,139 @@
+from unittest import TestCase, main
+
+from map.viewport_chunks import CHUNK_HEIGHT, CHUNK_WIDTH
+from utils.level_of_detail import SleepingEntities, UpdateLevelOfDetail, UpdateTier, select_update_tier
+
+
+class Settings:
+    update_lod = True
+    lod_reduced_interval = 3
+    lod_idle_interval = 8
+
+
+class Entity:
+
+    def __init__(self, entity_id, tier):
+        self.id = entity_id
+        self.update_tier = tier
+        self.skipped_time = 0.0
+        self.updates = []
+
+    def on_update(self, delta_time):
+        self.updates.append(delta_time)
+
+
+class PathFollower(Entity):
+    """Off-screen Unit stopping at each waypoint of its path, like the UnitsMovement does."""
+
+    def __init__(self, entity_id, path):
+        self.id = entity_id
+        self.skipped_time = 0.0
+        self.updates = []
+        self.path = path
+        self.change_x = 0.0
+
+    @property
+    def update_tier(self):
+        return select_update_tier(False, bool(self.change_x or self.path))
+
+    def on_update(self, delta_time):
+        super().on_update(delta_time)
+        # the Unit takes its next waypoint, and stops when it is reached:
+        self.change_x = 0.0
+        if self.path:
+            self.path.pop()
+
+
+class TestUpdateLevelOfDetail(TestCase):
+
+    def setUp(self) -> None:
+        self.settings = Settings()
+        self.lod = UpdateLevelOfDetail(self.settings)
+
+    def tearDown(self) -> None:
+        self.lod = None
+
+    def run_frames(self, entities, frames):
+        for _ in range(frames):
+            self.lod.update(entities, 0.5)
+
+    def test_tiers_are_updated_with_their_intervals(self):
+        entities = [Entity(i, tier) for i, tier in enumerate(UpdateTier)]
+        self.run_frames(entities, 24)
+        self.assertEqual([24, 8, 3], [len(entity.updates) for entity in entities])
+        self.assertEqual([1, 1, 1], self.lod.entities_count)
+
+    def test_skipped_time_is_accumulated(self):
+        entity = Entity(0, UpdateTier.IDLE)
+        self.run_frames([entity], 16)
+        self.assertEqual([4.0, 4.0], entity.updates)
+        self.assertEqual(0.0, entity.skipped_time)
+
+    def test_updates_of_tier_are_spread_among_frames(self):
+        entities = [Entity(i, UpdateTier.REDUCED) for i in range(9)]
+        for _ in range(3):
+            self.lod.update(entities, 0.5)
+            self.assertEqual([0, 3, 0], self.lod.updates_count)
+
+    def test_unit_stopped_at_waypoint_off_screen_is_not_idle(self):
+        unit = PathFollower(0, path=[(1, 1), (2, 2), (3, 3)])
+        self.assertIs(UpdateTier.REDUCED, unit.update_tier)
+        self.run_frames([unit], 3 * self.settings.lod_reduced_interval)
+        self.assertEqual([], unit.path)
+        self.assertEqual(3, len(unit.updates))
+        self.assertIs(UpdateTier.IDLE, unit.update_tier)
+
+    def test_disabled_lod_updates_everything(self):
+        self.settings.update_lod = False
+        entities = [Entity(i, UpdateTier.IDLE) for i in range(4)]
+        self.run_frames(entities, 2)
+        self.assertEqual([[0.5, 0.5]] * 4, [entity.updates for entity in entities])
+
+
+class Sleeper:
+
+    def __init__(self, x, y, faction, index, visibility_radius=300):
+        self.position = x, y
+        self.visibility_radius = visibility_radius
+        self.faction = faction
+        self.index = index
+        self.is_sleeping = True
+
+    def is_enemy(self, other):
+        return self.faction != other.faction
+
+    def wake_up(self):
+        self.is_sleeping = False
+        self.index.discard(self)
+
+
+class TestSleepingEntities(TestCase):
+
+    def setUp(self) -> None:
+        self.sleeping = SleepingEntities()
+
+    def tearDown(self) -> None:
+        self.sleeping = None
+
+    def test_enemy_nearby_wakes_only_enemies_in_adjacent_chunks(self):
+        near_enemy = Sleeper(CHUNK_WIDTH * 2 + 10, 10, 1, self.sleeping)
+        near_friend = Sleeper(CHUNK_WIDTH + 10, 10, 2, self.sleeping)
+        far_enemy = Sleeper(CHUNK_WIDTH * 5, 10, 1, self.sleeping)
+        for sleeper in (near_enemy, near_friend, far_enemy):
+            self.sleeping.add(sleeper)
+        self.sleeping.wake_enemies_near(Sleeper(CHUNK_WIDTH + 50, 50, 2, None))
+        self.assertFalse(near_enemy.is_sleeping)
+        self.assertTrue(near_friend.is_sleeping)
+        self.assertTrue(far_enemy.is_sleeping)
+        self.assertEqual(2, len(self.sleeping))
+        self.assertNotIn(near_enemy, self.sleeping)
+
+    def test_sleepers_seeing_farther_than_a_chunk_are_woken(self):
+        sniper = Sleeper(10, CHUNK_HEIGHT - 10, 1, self.sleeping, visibility_radius=CHUNK_HEIGHT + 100)
+        self.sleeping.add(sniper)
+        self.sleeping.wake_enemies_near(Sleeper(10, CHUNK_HEIGHT * 2 + 1, 2, None))
+        self.assertFalse(sniper.is_sleeping)
+
+
+if __name__ == '__main__':
+    main()
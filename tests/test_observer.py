@@ -0,0 +1,58 @@
+from unittest import TestCase, main
+
+from utils.observer import Observed, ObservedAttribute, Observer
+
+
+class Listener(Observer):
+
+    def __init__(self):
+        self.notifications = []
+
+    def on_being_attached(self, attached: Observed):
+        pass
+
+    def notify(self, attribute: str, value):
+        self.notifications.append((attribute, value))
+
+    def on_being_detached(self, detached: Observed):
+        pass
+
+
+class Subject(Observed):
+    health = ObservedAttribute()
+
+    def __init__(self):
+        super().__init__()
+        self.health = 100
+        self.position = 0, 0
+
+
+class TestObserved(TestCase):
+
+    def setUp(self) -> None:
+        self.subject = Subject()
+        self.listener = Listener()
+
+    def tearDown(self) -> None:
+        self.subject = self.listener = None
+
+    def test_only_observed_attributes_notify_observers(self):
+        self.subject.attach(self.listener, 'health')
+        self.subject.health = 50
+        self.subject.position = 10, 10
+        self.assertEqual([('health', 50)], self.listener.notifications)
+        self.assertEqual(50, self.subject.health)
+
+    def test_attaching_to_undeclared_attribute_fails(self):
+        with self.assertRaises(AttributeError):
+            self.subject.attach(self.listener, 'position')
+
+    def test_detached_observer_is_not_notified(self):
+        self.subject.attach(self.listener, 'health')
+        self.subject.detach(self.listener)
+        self.subject.health = 10
+        self.assertEqual([], self.listener.notifications)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+from unittest import TestCase, main
+
+import numpy as np
+
+from map.quadtree import Rect, IsometricRect, IsometricQuadTree
+
+
+class TestIsometricRect(TestCase):
+
+    def setUp(self) -> None:
+        # half-width 200, half-height 100:
+        self.diamond = IsometricRect(1000, 500, 400, 200)
+
+    def tearDown(self) -> None:
+        self.diamond = None
+
+    def test_corners_and_edges_are_contained(self):
+        corners = [(800, 500), (1200, 500), (1000, 600), (1000, 400)]
+        edges_middles = [(900, 550), (1100, 550), (1100, 450), (900, 450)]
+        for x, y in corners + edges_middles:
+            self.assertTrue(self.diamond.contains_point(x, y), (x, y))
+
+    def test_points_just_outside_edges_and_corners_are_not_contained(self):
+        outside = [(799, 500), (1201, 500), (1000, 601), (1000, 399), (900, 551), (1100, 449)]
+        for x, y in outside:
+            self.assertFalse(self.diamond.contains_point(x, y), (x, y))
+        # corners of the bounding box lie outside of the diamond:
+        self.assertFalse(self.diamond.contains_point(801, 599))
+
+    def test_contains_points_matches_contains_point(self):
+        xs, ys = np.meshgrid(np.arange(780, 1221, 5.0), np.arange(380, 621, 5.0))
+        xs, ys = xs.ravel(), ys.ravel()
+        mask = self.diamond.contains_points(xs, ys)
+        expected = [self.diamond.contains_point(x, y) for x, y in zip(xs, ys)]
+        self.assertEqual(expected, mask.tolist())
+
+    def test_diamonds_intersection(self):
+        touching = IsometricRect(1400, 500, 400, 200)
+        overlapping = IsometricRect(1050, 550, 200, 100)
+        separated = IsometricRect(1250, 650, 200, 100)
+        self.assertTrue(self.diamond.intersects(touching))
+        self.assertTrue(self.diamond.intersects(overlapping))
+        self.assertTrue(overlapping.intersects(self.diamond))
+        self.assertFalse(self.diamond.intersects(separated))
+        self.assertFalse(separated.intersects(self.diamond))
+
+    def test_diamond_and_rect_intersection(self):
+        inside = Rect(1000, 500, 10, 10)
+        enclosing = Rect(1000, 500, 1000, 1000)
+        crossing_edge = Rect(1100, 550, 20, 20)
+        in_bounding_box_corner = Rect(1180, 580, 20, 20)
+        self.assertTrue(self.diamond.intersects(inside))
+        self.assertTrue(self.diamond.intersects(enclosing))
+        self.assertTrue(self.diamond.intersects(crossing_edge))
+        self.assertFalse(self.diamond.intersects(in_bounding_box_corner))
+
+
+class TestIsometricQuadTree(TestCase):
+
+    def test_children_tile_parent(self):
+        parent = IsometricQuadTree(1000, 500, 400, 200)
+        parent.divide()
+        xs, ys = np.meshgrid(np.arange(790, 1211, 2.5), np.arange(390, 611, 2.5))
+        xs, ys = xs.ravel(), ys.ravel()
+        in_parent = parent.contains_points(xs, ys)
+        in_children = np.array([child.contains_points(xs, ys) for child in parent.children])
+        # each point of the parent belongs to some child, and no child
+        # reaches outside of the parent:
+        np.testing.assert_array_equal(in_parent, in_children.any(axis=0))
+        # children overlap only at their shared edges:
+        strictly_inside = [
+            (np.abs(xs - c.cx + 2 * (ys - c.cy)) < c.half_width) & (np.abs(xs - c.cx - 2 * (ys - c.cy)) < c.half_width)
+            for c in parent.children
+        ]
+        self.assertEqual(1, np.sum(strictly_inside, axis=0).max())
+        for child in parent.children:
+            self.assertEqual(parent.depth + 1, child.depth)
+            self.assertEqual(parent.half_width / 2, child.half_width)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+from unittest import TestCase, main
+
+from utils.scheduling import EventsScheduler, EventsCreator, ScheduledEvent
+
+
+class Timer:
+    total_game_time = 0.0
+
+
+class Game:
+    timer = Timer()
+
+
+class Creator(EventsCreator):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def call(self, name: str):
+        self.calls.append(name)
+
+
+class TestEventsScheduler(TestCase):
+
+    def setUp(self) -> None:
+        self.game = Game()
+        self.game.timer.total_game_time = 0.0
+        self.scheduler = EventsScheduler(self.game)
+        self.creator = Creator()
+
+    def tearDown(self) -> None:
+        self.scheduler = None
+
+    def advance(self, seconds: float):
+        self.game.timer.total_game_time += seconds
+        self.scheduler.update()
+
+    def test_events_are_executed_in_order_of_execution_time(self):
+        for name, delay in (('late', 3), ('early', 1), ('middle', 2)):
+            self.creator.schedule_event(ScheduledEvent(self.creator, delay, self.creator.call, args=(name,)))
+        self.advance(1.5)
+        self.assertEqual(['early'], self.creator.calls)
+        self.advance(2)
+        self.assertEqual(['early', 'middle', 'late'], self.creator.calls)
+        self.assertEqual(0, len(self.scheduler))
+        self.assertEqual([], self.creator.scheduled_events)
+
+    def test_unscheduled_events_are_not_executed(self):
+        events = [ScheduledEvent(self.creator, 1, self.creator.call, args=(i,)) for i in range(10)]
+        for event in events:
+            self.creator.schedule_event(event)
+        for event in events[::2]:
+            self.creator.unschedule_event(event)
+        self.advance(1)
+        self.assertEqual([1, 3, 5, 7, 9], self.creator.calls)
+
+    def test_repeated_event_is_rescheduled(self):
+        event = ScheduledEvent(self.creator, 1, self.creator.call, args=('tick',), repeat=2)
+        self.creator.schedule_event(event)
+        for _ in range(5):
+            self.advance(1)
+        self.assertEqual(['tick'] * 3, self.creator.calls)
+        self.assertNotIn(event, self.scheduler)
+
+    def test_event_can_unschedule_itself(self):
+        event = ScheduledEvent(self.creator, 1, lambda: self.creator.unschedule_event(event), repeat=-1)
+        other = ScheduledEvent(self.creator, 1, self.creator.call, args=('other',))
+        self.creator.schedule_event(event)
+        self.creator.schedule_event(other)
+        self.advance(1)
+        self.assertEqual(['other'], self.creator.calls)
+        self.assertEqual(0, len(self.scheduler))
+
+    def test_delay_left_is_restored(self):
+        event = ScheduledEvent(self.creator, 5, self.creator.call, args=('saved',), repeat=-1)
+        self.creator.schedule_event(event)
+        self.advance(3)
+        self.assertEqual(2, self.scheduler.time_left_to_event_execution(event))
+        restored = ScheduledEvent(self.creator, 5, self.creator.call, args=('saved',), repeat=-1, delay_left=0)
+        self.scheduler.schedule(restored)
+        self.advance(0)
+        self.assertEqual(['saved'], self.creator.calls)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+from unittest import TestCase, main
+
+from utils.instrumentation import metrics
+from utils.timing import timer
+
+
+def profiled_function(x: int) -> int:
+    return x * 2
+
+
+class TestTimer(TestCase):
+
+    def tearDown(self) -> None:
+        metrics.enabled = False
+        metrics.reset()
+
+    def test_disabled_timer_returns_undecorated_function(self):
+        decorated = timer(level=2, global_profiling_level=1)(profiled_function)
+        self.assertIs(profiled_function, decorated)
+
+    def test_enabled_timer_records_calls_in_metrics(self):
+        metrics.enabled = True
+        decorated = timer(level=1, global_profiling_level=1)(profiled_function)
+        self.assertEqual(4, decorated(2))
+        self.assertIn('profiled_function', metrics.spans)
+
+    def test_enabled_timer_does_not_swallow_exceptions(self):
+        decorated = timer(forced=True)(profiled_function)
+        with self.assertRaises(TypeError):
+            decorated()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+from unittest import TestCase, main
+
+from math import dist
+
+import numpy as np
+
+from units.movement import UnitsMovement, UNIT_RADIUS
+from utils.constants import TILE_WIDTH, TILE_HEIGHT
+
+
+class MovingThing:
+
+    def __init__(self, x, y):
+        self.position = x, y
+        self.change_x = self.change_y = 0
+
+
+class TestUnitsMovement(TestCase):
+
+    def setUp(self) -> None:
+        self.movement = UnitsMovement(capacity=2)
+
+    def tearDown(self) -> None:
+        self.movement = None
+
+    def test_unit_moves_toward_waypoint(self):
+        thing = MovingThing(0, 0)
+        slot = self.movement.add(thing)
+        self.movement.move(slot, 0, 0, 30, 40, speed=10)
+        self.movement.update(delta_time=1)
+        self.assertAlmostEqual(6, thing.position[0])
+        self.assertAlmostEqual(8, thing.position[1])
+        self.assertAlmostEqual(6, thing.change_x)
+
+    def test_unit_stops_exactly_at_waypoint(self):
+        thing = MovingThing(0, 0)
+        slot = self.movement.add(thing)
+        self.movement.move(slot, 0, 0, 3, 4, speed=10)
+        self.movement.update(delta_time=1)
+        self.assertEqual([3, 4], thing.position)
+        self.assertEqual((0, 0), (thing.change_x, thing.change_y))
+        thing.position = 100, 100
+        self.movement.update(delta_time=1)
+        self.assertEqual((100, 100), thing.position)
+
+    def test_stopped_and_removed_units_are_not_moved(self):
+        things = [MovingThing(i, 0) for i in range(5)]
+        slots = [self.movement.add(thing) for thing in things]
+        for slot in slots:
+            self.movement.move(slot, slot, 0, slot, 100, speed=1)
+        self.movement.stop(slots[1])
+        self.movement.remove(slots[2])
+        self.movement.update(delta_time=1)
+        self.assertEqual([(1, 0), (2, 0)], [things[1].position, things[2].position])
+        self.assertEqual([3, 1], things[3].position)
+        self.assertEqual(slots[2], self.movement.add(MovingThing(0, 0)))
+        self.assertEqual(5, len(self.movement))
+
+    def test_interpolated_positions_are_restored_before_update(self):
+        thing = MovingThing(0, 0)
+        slot = self.movement.add(thing)
+        self.movement.move(slot, 0, 0, 10, 0, speed=10)
+        self.movement.update(delta_time=0.5)
+        self.movement.interpolate(0.5)
+        self.assertEqual([2.5, 0], thing.position)
+        self.movement.stop(slot)
+        self.movement.update(delta_time=0.5)
+        self.assertEqual([5, 0], thing.position)
+
+    def test_moving_units_are_restored_for_the_game_logic(self):
+        thing = MovingThing(0, 0)
+        slot = self.movement.add(thing)
+        self.movement.move(slot, 0, 0, 10, 0, speed=10)
+        self.movement.update(delta_time=0.5)
+        self.movement.interpolate(0.25)
+        self.assertEqual([1.25, 0], thing.position)
+        self.movement.restore_positions()
+        self.assertEqual([5, 0], thing.position)
+
+
+class TestLocalAvoidance(TestCase):
+
+    def setUp(self) -> None:
+        self.movement = UnitsMovement(capacity=2, local_avoidance=True)
+
+    def tearDown(self) -> None:
+        self.movement = None
+
+    def assert_passed_without_collision(self, first: MovingThing, second: MovingThing):
+        closest = dist(first.position, second.position)
+        for _ in range(60 * 10):
+            self.movement.update(delta_time=1 / 60)
+            closest = min(closest, dist(first.position, second.position))
+        self.assertGreaterEqual(closest, 2 * UNIT_RADIUS - 0.1)
+        self.assertEqual([300, 0], first.position)
+
+    def test_units_heading_at_each_other_pass_by(self):
+        first, second = MovingThing(0, 0), MovingThing(300, 0)
+        self.movement.move(self.movement.add(first), 0, 0, 300, 0, speed=50)
+        self.movement.move(self.movement.add(second), 300, 0, 0, 0, speed=50)
+        self.assert_passed_without_collision(first, second)
+        self.assertEqual([0, 0], second.position)
+
+    def test_unit_goes_around_standing_unit(self):
+        first, second = MovingThing(0, 0), MovingThing(150, 0)
+        self.movement.move(self.movement.add(first), 0, 0, 300, 0, speed=50)
+        self.movement.add(second)
+        self.assert_passed_without_collision(first, second)
+        self.assertEqual((150, 0), second.position)
+
+    def test_steering_does_not_enter_obstacles(self):
+        self.movement.obstacles = obstacles = np.zeros((10, 10), dtype=np.uint8)
+        # wall along the path, on the side where units pass each other:
+        obstacles[:, 0] = 1
+        y = TILE_HEIGHT * 1.5
+        first, second = MovingThing(TILE_WIDTH * 0.5, y), MovingThing(TILE_WIDTH * 4.5, y)
+        self.movement.move(self.movement.add(first), *first.position, TILE_WIDTH * 8.5, y, speed=50)
+        self.movement.add(second)
+        for _ in range(60 * 15):
+            self.movement.update(delta_time=1 / 60)
+            self.assertGreaterEqual(first.position[1], TILE_HEIGHT)
+        self.assertEqual([TILE_WIDTH * 8.5, y], first.position)
+
+    def test_unit_stops_when_its_waypoint_is_taken(self):
+        first, second = MovingThing(0, 0), MovingThing(150, 0)
+        slot = self.movement.add(first)
+        self.movement.move(slot, 0, 0, 150, 0, speed=50)
+        self.movement.add(second)
+        for _ in range(60 * 10):
+            self.movement.update(delta_time=1 / 60)
+        self.assertFalse(self.movement.moving[slot])
+        self.assertEqual((0, 0), (first.change_x, first.change_y))
+        self.assertLess(dist(first.position, second.position), 3 * UNIT_RADIUS)
+
+
+if __name__ == '__main__':
+    main()
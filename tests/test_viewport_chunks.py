@@ -0,0 +1,35 @@
+from unittest import TestCase, main
+
+from map.viewport_chunks import CHUNK_WIDTH, CHUNK_HEIGHT, ViewportChunks, position_to_chunk
+
+
+class TestViewportChunks(TestCase):
+
+    def setUp(self) -> None:
+        self.chunks = ViewportChunks()
+
+    def tearDown(self) -> None:
+        self.chunks = None
+
+    def test_position_to_chunk(self):
+        self.assertEqual((0, 0), position_to_chunk(0, 0))
+        self.assertEqual((1, 2), position_to_chunk(CHUNK_WIDTH, CHUNK_HEIGHT * 2 + 1))
+
+    def test_visible_chunks_cover_viewport_with_margin(self):
+        self.chunks.update((CHUNK_WIDTH * 3, CHUNK_WIDTH * 4, CHUNK_HEIGHT * 2 + 1, CHUNK_HEIGHT * 3 - 1))
+        self.assertEqual((2, 5, 1, 4), self.chunks.bounds)
+        self.assertIn((3, 2), self.chunks)
+        self.assertNotIn((5, 2), self.chunks)
+        self.assertEqual(9, len(self.chunks.visible))
+
+    def test_changed_only_when_visible_chunks_change(self):
+        self.chunks.update((100, 1000, 100, 700))
+        self.assertTrue(self.chunks.changed)
+        self.chunks.update((100, 1000, 100, 700))
+        self.assertFalse(self.chunks.changed)
+        self.chunks.update((101, 1001, 100, 700))
+        self.assertFalse(self.chunks.changed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from map.viewport_chunks import position_to_chunk
+
+EXPERIENCE_HIT_CHANCE_BONUS = 0.05
+
+INFANTRY_HIT_CHANCE_PENALTY = -25
+
+TARGET_MOVEMENT_HIT_PENALTY = -15
+
+MOVEMENT_HIT_PENALTY = -25
+
+BUILDING_HIT_CHANCE_BONUS = 25
+
+
+class CombatResolver:
+    """
+    Weapons do not hit their targets immediately when they fire, but register
+    their shots here, and all shots fired in the simulation tick are resolved
+    at once in resolve(): hit chances, rolls and damage are computed for all
+    of them with numpy arrays, then damage is summed per target and applied
+    once, so each destroyed target is killed once, and sound of each kind of
+    shot is played once per tick in each map chunk where it was fired.
+    """
+
+    def __init__(self, settings, seed: Optional[int] = None):
+        self.settings = settings
+        self.random = np.random.default_rng(seed)
+        self.shots: List[Tuple[Any, Any]] = []  # Weapon, target PlayerEntity
+
+    def __len__(self) -> int:
+        return len(self.shots)
+
+    def add_shot(self, weapon, target):
+        self.shots.append((weapon, target))
+
+    def resolve(self):
+        if not (shots := self.shots):
+            return
+        self.shots = []
+        weapons = [weapon for weapon, _ in shots]
+        shooters = [weapon.owner for weapon in weapons]
+        targets = [target for _, target in shots]
+        hits, damage = self.roll_damage(weapons, shooters, targets)
+        self.apply_damage(weapons, shooters, targets, hits, damage)
+        self.create_shots_effects(weapons)
+
+    def roll_damage(self, weapons: List, shooters: List, targets: List) -> Tuple[np.ndarray, np.ndarray]:
+        count = len(weapons)
+        hit_chances = np.fromiter((w.accuracy for w in weapons), np.float64, count)
+        hit_chances -= np.fromiter((t.cover for t in targets), np.float64, count)
+        hit_chances += EXPERIENCE_HIT_CHANCE_BONUS * (
+            np.fromiter((s.experience for s in shooters), np.float64, count) -
+            np.fromiter((t.experience for t in targets), np.float64, count)
+        )
+        targets_buildings = np.fromiter((t.is_building for t in targets), np.bool_, count)
+        hit_chances += BUILDING_HIT_CHANCE_BONUS * targets_buildings
+        hit_chances += MOVEMENT_HIT_PENALTY * np.fromiter((s.is_moving for s in shooters), np.bool_, count)
+        hit_chances += TARGET_MOVEMENT_HIT_PENALTY * np.fromiter((t.is_moving for t in targets), np.bool_, count)
+        hit_chances += INFANTRY_HIT_CHANCE_PENALTY * (
+            np.fromiter((t.is_infantry for t in targets), np.int64, count) -
+            np.fromiter((s.is_infantry for s in shooters), np.int64, count)
+        )
+        hits = self.random.uniform(0, 100, count) < hit_chances
+
+        # Buildings ignore penetration of the weapons (TODO: killing personnel inside Building):
+        penetration = np.fromiter((w.penetration for w in weapons), np.float64, count) * ~targets_buildings
+        armour = np.fromiter((t.armour for t in targets), np.float64, count)
+        effectiveness = 1 - np.maximum(armour - penetration, 0)
+        base_damage = np.fromiter((w.damage for w in weapons), np.float64, count)
+        damage = self.random.normal(base_damage, self.settings.damage_randomness_factor) * effectiveness
+        return hits, damage
+
+    @staticmethod
+    def apply_damage(weapons: List, shooters: List, targets: List, hits: np.ndarray, damage: np.ndarray):
+        """
+        Immortal targets do not take any damage, but still receive it to be
+        woken up. Targets killed before the shots were resolved are skipped.
+        """
+        damage_taken: Dict[Any, float] = {}
+        for weapon, shooter, target, hit, dealt in zip(weapons, shooters, targets, hits.tolist(), damage.tolist()):
+            if not (hit and target.is_alive):
+                continue
+            if target.player.immortal:
+                dealt = 0.0
+            damage_taken[target] = damage_taken.get(target, 0.0) + dealt
+            shooter.experience += round(dealt / weapon.damage, 2)
+        for target, dealt in damage_taken.items():
+            target.receive_damage(dealt)
+        for shooter, target in {(shooter, target) for shooter, target in zip(shooters, targets)}:
+            shooter.check_if_enemy_destroyed(target)
+
+    @staticmethod
+    def create_shots_effects(weapons: List):
+        played = set()
+        for weapon in weapons:
+            if (key := (weapon.shot_sound, position_to_chunk(*weapon.owner.position))) not in played:
+                played.add(key)
+                weapon.create_shot_audio_visual_effects()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+from typing import Any, List, Optional
+
+import numpy as np
+
+from numba import njit
+
+from utils.constants import TILE_WIDTH, TILE_HEIGHT
+
+# radius of the circle each Unit occupies for the local collisions-avoidance,
+# smaller than half of the map-grid, so Units standing on adjacent nodes do
+# not collide:
+UNIT_RADIUS = 0.4 * min(TILE_WIDTH, TILE_HEIGHT)
+# how many seconds ahead collisions with neighbours are avoided:
+AVOIDANCE_HORIZON = 1.0
+# size of the cells of the spatial index, Units further than this are never
+# treated as neighbours:
+NEIGHBOURHOOD_SIZE = 2 * TILE_WIDTH
+MAX_NEIGHBOURS = 10
+KEEP_RIGHT_BIAS = 0.1
+CELL_KEY_STRIDE = 1 << 20
+
+
+@njit(nogil=True, fastmath=True, cache=True)
+def integrate_movement(positions: np.ndarray,
+                       velocities: np.ndarray,
+                       waypoints: np.ndarray,
+                       speeds: np.ndarray,
+                       moving: np.ndarray,
+                       count: int,
+                       delta_time: float,
+                       moved: np.ndarray) -> int:
+    """
+    Move each moving unit straight toward its waypoint with its speed, and
+    stop it exactly at the waypoint if it would be reached in this step.
+
+    :return: int -- number of indices of moved units written to the 'moved'
+    """
+    moved_count = 0
+    for i in range(count):
+        if not moving[i]:
+            continue
+        dx = waypoints[i, 0] - positions[i, 0]
+        dy = waypoints[i, 1] - positions[i, 1]
+        distance = np.sqrt(dx * dx + dy * dy)
+        if distance <= speeds[i] * delta_time:
+            positions[i, 0], positions[i, 1] = waypoints[i, 0], waypoints[i, 1]
+            velocities[i, 0] = velocities[i, 1] = 0.0
+            moving[i] = 0
+        else:
+            velocities[i, 0] = dx / distance * speeds[i]
+            velocities[i, 1] = dy / distance * speeds[i]
+            positions[i, 0] += velocities[i, 0] * delta_time
+            positions[i, 1] += velocities[i, 1] * delta_time
+        moved[moved_count] = i
+        moved_count += 1
+    return moved_count
+
+
+@njit(nogil=True, cache=True)
+def lower_bound(sorted_keys: np.ndarray, key: int) -> int:
+    """Binary search, which is much faster than np.searchsorted in numba."""
+    low, high = 0, len(sorted_keys)
+    while low < high:
+        middle = (low + high) >> 1
+        if sorted_keys[middle] < key:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+@njit(nogil=True, fastmath=True, cache=True)
+def steer_movement(positions: np.ndarray,
+                   velocities: np.ndarray,
+                   waypoints: np.ndarray,
+                   speeds: np.ndarray,
+                   radii: np.ndarray,
+                   moving: np.ndarray,
+                   occupied: np.ndarray,
+                   obstacles: np.ndarray,
+                   count: int,
+                   delta_time: float,
+                   moved: np.ndarray) -> int:
+    """
+    Move each moving unit toward its waypoint like integrate_movement, but
+    first adjust its velocity to avoid collisions with the neighbouring units
+    within AVOIDANCE_HORIZON, using the optimal reciprocal collision avoidance
+    (ORCA). Each neighbour adds a half-plane of the allowed velocities, and
+    the preferred velocity is projected onto the violated half-planes one by
+    one, instead of solving the exact linear program. Moving neighbours take
+    half of the responsibility for avoiding the collision, and the standing
+    ones are avoided completely by the moving unit.
+
+    Steered velocity which would take the unit onto a map-grid marked in the
+    obstacles array is replaced with the preferred one, heading straight to
+    the waypoint, which lies on the path found around the obstacles. A unit
+    which reached the standing unit occupying its waypoint stops there, to
+    let the game logic choose another waypoint, instead of circling around.
+
+    Neighbours are found in a spatial index built each step: units sorted by
+    the key of the NEIGHBOURHOOD_SIZE cell they are in, searched in 3x3 cells.
+
+    :return: int -- number of indices of moved units written to the 'moved'
+    """
+    keys = np.empty(count, dtype=np.int64)
+    for i in range(count):
+        if occupied[i]:
+            cx = int(positions[i, 0] // NEIGHBOURHOOD_SIZE)
+            cy = int(positions[i, 1] // NEIGHBOURHOOD_SIZE)
+            keys[i] = cx * CELL_KEY_STRIDE + cy
+        else:
+            keys[i] = -1
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    # neighbours data copied in the index order, to be scanned sequentially:
+    sorted_positions = positions[order]
+
+    new_velocities = np.zeros((count, 2), dtype=np.float64)
+    waypoint_taken = np.zeros(count, dtype=np.uint8)
+    columns, rows = obstacles.shape
+    lines = np.empty((MAX_NEIGHBOURS, 4), dtype=np.float64)
+    inverted_horizon = 1.0 / AVOIDANCE_HORIZON
+    inverted_time_step = 1.0 / delta_time
+    for i in range(count):
+        if not moving[i]:
+            continue
+        x, y = positions[i, 0], positions[i, 1]
+        dx, dy = waypoints[i, 0] - x, waypoints[i, 1] - y
+        distance = np.sqrt(dx * dx + dy * dy)
+        speed = speeds[i]
+        if distance <= speed * delta_time:
+            continue  # unit arrives at its waypoint in this step
+        velocity_x, velocity_y = velocities[i, 0], velocities[i, 1]
+
+        lines_count = 0
+        cx, cy = int(x // NEIGHBOURHOOD_SIZE), int(y // NEIGHBOURHOOD_SIZE)
+        for ox in range(-1, 2):
+            # three cells in the same column have consecutive keys:
+            first_key = (cx + ox) * CELL_KEY_STRIDE + cy - 1
+            k = lower_bound(sorted_keys, first_key)
+            while k < count and sorted_keys[k] <= first_key + 2 and lines_count < MAX_NEIGHBOURS:
+                px, py = sorted_positions[k, 0] - x, sorted_positions[k, 1] - y
+                k += 1
+                distance_sq = px * px + py * py
+                if distance_sq > NEIGHBOURHOOD_SIZE * NEIGHBOURHOOD_SIZE:
+                    continue
+                j = order[k - 1]
+                if j == i:
+                    continue
+                r = radii[i] + radii[j]
+                r_sq = r * r
+                if not moving[j]:
+                    qx, qy = waypoints[i, 0] - sorted_positions[k - 1, 0], waypoints[i, 1] - sorted_positions[k - 1, 1]
+                    if qx * qx + qy * qy < r_sq and distance_sq <= (r + radii[i]) ** 2:
+                        waypoint_taken[i] = 1
+                        break
+                vx, vy = velocity_x - velocities[j, 0], velocity_y - velocities[j, 1]
+                if distance_sq > r_sq:
+                    # no collision yet, project on the velocity obstacle:
+                    wx, wy = vx - inverted_horizon * px, vy - inverted_horizon * py
+                    w_length_sq = wx * wx + wy * wy
+                    dot = wx * px + wy * py
+                    if dot < 0.0 and dot * dot > r_sq * w_length_sq:
+                        # project on the cut-off circle
+                        w_length = np.sqrt(w_length_sq)
+                        ux, uy = wx / w_length, wy / w_length
+                        direction_x, direction_y = uy, -ux
+                        ux *= r * inverted_horizon - w_length
+                        uy *= r * inverted_horizon - w_length
+                    else:
+                        # project on the closer leg of the velocity obstacle
+                        leg = np.sqrt(distance_sq - r_sq)
+                        if px * wy - py * wx > 0.0:
+                            direction_x = (px * leg - py * r) / distance_sq
+                            direction_y = (px * r + py * leg) / distance_sq
+                        else:
+                            direction_x = -(px * leg + py * r) / distance_sq
+                            direction_y = -(-px * r + py * leg) / distance_sq
+                        dot = vx * direction_x + vy * direction_y
+                        ux, uy = dot * direction_x - vx, dot * direction_y - vy
+                else:
+                    # units already overlap, separate them in this step:
+                    wx, wy = vx - inverted_time_step * px, vy - inverted_time_step * py
+                    w_length = np.sqrt(wx * wx + wy * wy)
+                    if w_length == 0.0:
+                        continue
+                    ux, uy = wx / w_length, wy / w_length
+                    direction_x, direction_y = uy, -ux
+                    ux *= r * inverted_time_step - w_length
+                    uy *= r * inverted_time_step - w_length
+                responsibility = 0.5 if moving[j] else 1.0
+                lines[lines_count, 0] = velocity_x + responsibility * ux
+                lines[lines_count, 1] = velocity_y + responsibility * uy
+                lines[lines_count, 2] = direction_x
+                lines[lines_count, 3] = direction_y
+                lines_count += 1
+
+        if waypoint_taken[i]:
+            continue
+        preferred_x, preferred_y = dx / distance * speed, dy / distance * speed
+        new_x, new_y = preferred_x, preferred_y
+        if lines_count:
+            # prefer passing others on the right, which breaks the symmetric
+            # deadlocks of the units heading straight at each other:
+            new_x, new_y = new_x + KEEP_RIGHT_BIAS * new_y, new_y - KEEP_RIGHT_BIAS * new_x
+        for line in range(lines_count):
+            point_x, point_y = lines[line, 0], lines[line, 1]
+            direction_x, direction_y = lines[line, 2], lines[line, 3]
+            if direction_x * (point_y - new_y) - direction_y * (point_x - new_x) > 0.0:
+                t = direction_x * (new_x - point_x) + direction_y * (new_y - point_y)
+                new_x, new_y = point_x + direction_x * t, point_y + direction_y * t
+        new_speed = np.sqrt(new_x * new_x + new_y * new_y)
+        if new_speed > speed:
+            new_x, new_y = new_x / new_speed * speed, new_y / new_speed * speed
+        if columns:
+            gx = int((x + new_x * delta_time) // TILE_WIDTH)
+            gy = int((y + new_y * delta_time) // TILE_HEIGHT)
+            if not (0 <= gx < columns and 0 <= gy < rows) or obstacles[gx, gy]:
+                new_x, new_y = preferred_x, preferred_y
+        new_velocities[i, 0], new_velocities[i, 1] = new_x, new_y
+
+    # all velocities are changed at once, so each unit avoided its neighbours
+    # basing on the same state of the crowd:
+    moved_count = 0
+    for i in range(count):
+        if not moving[i]:
+            continue
+        dx = waypoints[i, 0] - positions[i, 0]
+        dy = waypoints[i, 1] - positions[i, 1]
+        if dx * dx + dy * dy <= (speeds[i] * delta_time) ** 2:
+            positions[i, 0], positions[i, 1] = waypoints[i, 0], waypoints[i, 1]
+            velocities[i, 0] = velocities[i, 1] = 0.0
+            moving[i] = 0
+        elif waypoint_taken[i]:
+            velocities[i, 0] = velocities[i, 1] = 0.0
+            moving[i] = 0
+        else:
+            velocities[i, 0], velocities[i, 1] = new_velocities[i, 0], new_velocities[i, 1]
+            positions[i, 0] += velocities[i, 0] * delta_time
+            positions[i, 1] += velocities[i, 1] * delta_time
+        moved[moved_count] = i
+        moved_count += 1
+    return moved_count
+
+
+class UnitsMovement:
+    """
+    Keeps positions, velocities, current waypoints and speeds of all Units in
+    arrays, so movement of every Unit is integrated in a single compiled loop
+    each frame, and only the Units which actually moved get their sprites
+    positions updated. Each Unit occupies a slot in these arrays from its
+    creation to its death.
+
+    Positions in arrays are authoritative only while the Unit is moving -
+    each call to move() synchronises them with the current sprite position.
+
+    Game logic runs in fixed ticks, and Units which moved in the last tick are
+    drawn between their previous and current positions with interpolate().
+    Call restore_positions() at the start of each tick, before any other
+    system runs, so logic never sees the interpolated positions.
+
+    With the 'local_avoidance' enabled, moving Units steer around each other
+    with steer_movement, instead of relying only on the MapNodes blocking.
+    The Map shares its 'obstacles' array, so steering never pushes a Unit
+    into trees, buildings or impassable terrain.
+    """
+
+    def __init__(self, capacity: int = 256, local_avoidance: bool = False):
+        self.local_avoidance = local_avoidance
+        self.positions = np.zeros((capacity, 2), dtype=np.float64)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float64)
+        self.waypoints = np.zeros((capacity, 2), dtype=np.float64)
+        self.speeds = np.zeros(capacity, dtype=np.float64)
+        self.radii = np.zeros(capacity, dtype=np.float64)
+        self.moving = np.zeros(capacity, dtype=np.uint8)
+        self.occupied = np.zeros(capacity, dtype=np.uint8)
+        self.moved = np.zeros(capacity, dtype=np.int64)
+        # map-grids blocked for movement, empty until the Map is created:
+        self.obstacles = np.zeros((0, 0), dtype=np.uint8)
+        # positions before the last update, and slots moved in it:
+        self.previous_positions = np.zeros((0, 2), dtype=np.float64)
+        self.last_moved: List[int] = []
+        self.interpolated = False
+        # Units occupying the slots, None in the free slots:
+        self.units: List[Optional[Any]] = []
+        self.free_slots: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.units) - len(self.free_slots)
+
+    def add(self, unit, radius: float = UNIT_RADIUS) -> int:
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.units[slot] = unit
+        else:
+            slot = len(self.units)
+            self.units.append(unit)
+            if slot == len(self.speeds):
+                self._grow()
+        self.positions[slot] = unit.position
+        self.velocities[slot] = 0.0
+        self.radii[slot] = radius
+        self.moving[slot] = 0
+        self.occupied[slot] = 1
+        return slot
+
+    def _grow(self):
+        for name in ('positions', 'velocities', 'waypoints', 'speeds', 'radii', 'moving', 'occupied', 'moved'):
+            array = getattr(self, name)
+            grown = np.zeros((len(array) * 2, *array.shape[1:]), dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def remove(self, slot: int):
+        if self.units[slot] is None:
+            return
+        self.moving[slot] = self.occupied[slot] = 0
+        self.units[slot] = None
+        self.free_slots.append(slot)
+
+    def place(self, slot: int, x: float, y: float):
+        """Synchronise position of the Unit put somewhere without moving."""
+        self.positions[slot] = x, y
+        self.occupied[slot] = 1
+
+    def hide(self, slot: int):
+        """Exclude the Unit from the collisions-avoidance, e.g. when it entered a Building."""
+        self.stop(slot)
+        self.occupied[slot] = 0
+
+    def move(self, slot: int, x: float, y: float, waypoint_x: float, waypoint_y: float, speed: float):
+        self.positions[slot] = x, y
+        self.waypoints[slot] = waypoint_x, waypoint_y
+        self.speeds[slot] = speed
+        self.moving[slot] = 1
+
+    def stop(self, slot: int):
+        self.moving[slot] = 0
+        self.velocities[slot] = 0.0
+
+    def update(self, delta_time: float):
+        self.restore_positions()
+        self.previous_positions = self.positions[:len(self.units)].copy()
+        if self.local_avoidance:
+            count = steer_movement(
+                self.positions, self.velocities, self.waypoints, self.speeds, self.radii, self.moving,
+                self.occupied, self.obstacles, len(self.units), delta_time, self.moved
+            )
+        else:
+            count = integrate_movement(
+                self.positions, self.velocities, self.waypoints, self.speeds, self.moving,
+                len(self.units), delta_time, self.moved
+            )
+        self.last_moved = moved = self.moved[:count].tolist()
+        if not count:
+            return
+        units = self.units
+        for slot, position, velocity in zip(moved, self.positions[moved].tolist(),
+                                            self.velocities[moved].tolist()):
+            unit = units[slot]
+            unit.position = position
+            unit.change_x, unit.change_y = velocity
+
+    def restore_positions(self):
+        """Put Units interpolated since the last update back at their exact positions."""
+        if not self.interpolated:
+            return
+        self.interpolated = False
+        moved, units = self.last_moved, self.units
+        for slot, position in zip(moved, self.positions[moved].tolist()):
+            if (unit := units[slot]) is not None:
+                unit.position = position
+
+    def interpolate(self, interpolation: float):
+        """
+        Move sprites of the Units moved in the last update to the positions
+        between the previous and the current one, where 'interpolation' is
+        the fraction of the simulation tick elapsed since this update.
+        """
+        if not (moved := self.last_moved):
+            return
+        previous = self.previous_positions[moved]
+        positions = previous + (self.positions[moved] - previous) * interpolation
+        units = self.units
+        for slot, position in zip(moved, positions.tolist()):
+            if (unit := units[slot]) is not None:
+                unit.position = position
+        self.interpolated = True
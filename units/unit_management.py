@@ -337,6 +337,7 @@ class UnitsManager(EventsCreator):
             new_map_node = self.game.map.node(position)
             unit.swap_blocked_nodes(unit.current_node, new_map_node)
             unit.position = new_map_node.position
+            self.game.units_movement.place(unit.movement_slot, *unit.position)
 
     def create_movement_order(self, units, x, y):
         if self.waypoints_mode:
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import random
-import time
 from enum import IntEnum
 
 from math import dist
@@ -12,7 +11,7 @@ from functools import cached_property
 from typing import Deque, List, Dict, Optional, Union
 
 from arcade import (
-    Sprite, load_textures, draw_circle_filled, draw_circle_outline,draw_text, Texture, load_texture, draw_line
+    Sprite, draw_circle_filled, draw_circle_outline,draw_text, Texture, draw_line
 )
 from arcade.arcade_types import Point
 
@@ -25,11 +24,10 @@ from map.map import (
 from players_and_factions.player import Player, PlayerEntity
 from user_interface.user_interface import UiElement, UiTextLabel
 from utils.colors import GREEN, value_to_color
-from utils.functions import (get_path_to_file, get_texture_size, ignore_in_editor_mode)
+from utils.functions import ignore_in_editor_mode
 from utils.game_logging import log_here
 from utils.geometry import (
-    precalculate_possible_sprites_angles, calculate_angle,
-    vector_2d, ROTATION_STEP, ROTATIONS
+    precalculate_possible_sprites_angles, calculate_angle, ROTATION_STEP, ROTATIONS
 )
 
 
@@ -76,13 +74,18 @@ class Unit(PlayerEntity, ABC):
 
         self.forced_destination = False
         self.path: Deque[GridPosition] = deque()
-        self.path_wait_counter: int = 0
+        self.path_wait_counter: float = 0
         self.awaited_path: Optional[MapPath] = None
 
         self.max_speed = 0
         self.current_speed = 0
         self.rotation_speed = 0
 
+        # movement of all Units is integrated in batch by the UnitsMovement,
+        # each Unit only sets waypoint it is currently moving to:
+        self.movement_slot = self.game.units_movement.add(self)
+        self.current_waypoint: Optional[Point] = None
+
         self.permanent_units_group: int = 0
         self.navigating_group = None
         self.waypoints_queue = None
@@ -93,7 +96,7 @@ class Unit(PlayerEntity, ABC):
 
         self.explosion_name = EXPLOSION
 
-        self.layered_spritelist.swap_rendering_layers(self, 0, self.current_node.grid[1])
+        self.layered_spritelist.swap_rendering_layers(self, self.current_node.grid[1])
 
     @abstractmethod
     def _load_textures(self):
@@ -147,32 +150,50 @@ class Unit(PlayerEntity, ABC):
             return selected
         return selected or self in selection
 
+    def update_position(self, delta_time: float):
+        pass  # positions of the Units are updated by the UnitsMovement
+
+    def stop(self):
+        super().stop()
+        self.current_waypoint = None
+        self.game.units_movement.stop(self.movement_slot)
+
     def on_update(self, delta_time: float = 1/60):
+        if self.is_sleeping:
+            return self.update_visibility()
         super().on_update(delta_time)
         new_current_node = self.update_current_node()
         self.update_observed_area(new_current_node)
         self.update_blocked_map_nodes(new_current_node)
         self.update_pathfinding()
+        if self.can_sleep:
+            self.fall_asleep()
+
+    @property
+    def can_sleep(self) -> bool:
+        return super().can_sleep and not (
+            self.has_destination or self.is_moving or self.tasks or self.waypoints_queue is not None
+        )
 
     def update_current_node(self):
         current_node = self.get_current_node()
         if current_node is not self.current_node:
+            self.game.sleeping_entities.wake_enemies_near(self)
             if self.quadtree is not None and not self.quadtree.in_bounds(self):
                 self.update_in_map_quadtree()
         return current_node
 
     def get_current_node(self):
         current_node = self.map.position_to_node(*self.position)
-        if (old_y := self.current_node.grid[1]) != (new_y := current_node.grid[1]):
-            self.layered_spritelist.swap_rendering_layers(self, old_y, new_y)
+        if current_node.grid[1] != self.current_node.grid[1]:
+            self.layered_spritelist.swap_rendering_layers(self, current_node.grid[1])
         return current_node
 
     def update_observed_area(self, current_node: MapNode):
-        if self.observed_nodes and current_node == self.current_node:
-            pass
-        else:
-            self.observed_grids = grids = self.calculate_observed_area()
-            self.observed_nodes = {self.map[grid] for grid in grids}
+        if self.observed_grid is None:
+            self.start_observing(current_node.grid)
+        elif current_node is not self.current_node:
+            self.move_observed_grid(current_node.grid)
 
     def update_blocked_map_nodes(self, new_current_node: MapNode):
         """
@@ -199,12 +220,16 @@ class Unit(PlayerEntity, ABC):
             self.unblock_map_node(unblocked)
         self.block_map_node(blocked)
 
-    @staticmethod
-    def unblock_map_node(node: MapNode):
-        node.unit = None
+    def unblock_map_node(self, node: MapNode):
+        # with local avoidance Units can pass through nodes occupied by others:
+        if node.unit is self:
+            node.unit = None
 
     def block_map_node(self, node: MapNode):
-        node.unit = self
+        # passing Unit must not take the node from the Unit standing on it, but
+        # the Unit which stopped takes it from the one passing by:
+        if (occupant := node.unit) is None or (occupant.is_moving and not self.is_moving):
+            node.unit = self
 
     def scan_next_nodes_for_collisions(self):
         next_node = self.map.position_to_node(*self.path[0])
@@ -214,7 +239,13 @@ class Unit(PlayerEntity, ABC):
             self.find_alternative_path()
 
     def find_best_way_to_avoid_collision(self, blocker: Unit):
-        if blocker.has_destination or self.is_enemy(blocker):
+        local_avoidance = self.game.units_movement.local_avoidance
+        if blocker.is_moving and local_avoidance:
+            pass  # UnitsMovement steers this Unit around the moving blocker
+        elif local_avoidance and len(self.path) == 1 and not (blocker.has_destination or self.is_enemy(blocker)):
+            self.path.clear()  # destination is taken for good, so stop next to it
+            self.stop()
+        elif blocker.has_destination or self.is_enemy(blocker):
             self.wait_for_free_path(self.path)
         elif self.find_alternative_path() is not None:
             pass
@@ -225,6 +256,11 @@ class Unit(PlayerEntity, ABC):
     def has_destination(self) -> bool:
         return self.path or self.awaited_path or self in Pathfinder.instance
 
+    @property
+    def is_travelling(self) -> bool:
+        # Unit stops at each waypoint and while rotating, but it is still on its way:
+        return self.is_moving or self.awaited_path is not None or bool(self.has_destination)
+
     def wait_for_free_path(self, path: Deque):
         """
         Waiting for free path is useful when next node is only temporarily
@@ -232,7 +268,7 @@ class Unit(PlayerEntity, ABC):
         the path with A* algorithm. Instead, Unit 'shelves' currently found
         path and after 1 second 'unshelves' it in countdown_waiting method.
         """
-        self.path_wait_counter = time.time() + 1
+        self.path_wait_counter = self.timer.total_game_time + 1
         self.awaited_path = path.copy()
         self.path.clear()
         self.stop()
@@ -268,7 +304,7 @@ class Unit(PlayerEntity, ABC):
             self.stop()
 
     def countdown_waiting(self, path):
-        if time.time() >= self.path_wait_counter:
+        if self.timer.total_game_time >= self.path_wait_counter:
             node = self.map.position_to_node(*path[0])
             if node.is_walkable or len(path) < 20:
                 self.restart_path(path)
@@ -287,7 +323,7 @@ class Unit(PlayerEntity, ABC):
         destination = self.path[0]
         if dist(self.position, destination) < CLOSE_ENOUGH_DISTANCE * self.max_speed:
             self.move_to_next_waypoint()
-        else:
+        elif destination != self.current_waypoint:
             angle_to_target = int(calculate_angle(*self.position, *destination))
             if self.virtual_angle != angle_to_target:
                 self.stop()
@@ -320,16 +356,20 @@ class Unit(PlayerEntity, ABC):
         self.path.popleft()
 
     def move_to_current_waypoint(self, destination):
-        angle = calculate_angle(*self.position, *destination)
-        self.change_x, self.change_y = vector_2d(angle, self.max_speed * self.health_ratio)
+        self.current_waypoint = destination
+        self.game.units_movement.move(
+            self.movement_slot, *self.position, *destination, self.max_speed * self.health_ratio
+        )
 
     def move_to(self, destination: GridPosition, forced: bool = False):
+        self.wake_up()
         self.cancel_path_requests()
         self.forced_destination = forced
         start = position_to_map_grid(*self.position)
         self.game.pathfinder.request_path(self, start, destination)
 
     def follow_new_path(self, new_path: MapPath):
+        self.wake_up()
         self.path.clear()
         self.awaited_path = None
         self.path.extend(new_path[1:])
@@ -349,6 +389,7 @@ class Unit(PlayerEntity, ABC):
         self.cancel_path_requests()
         self.awaited_path = None
         self.path.clear()
+        self.stop()
         self.cancel_tasks()
 
     def leave_waypoints_queue(self):
@@ -400,6 +441,7 @@ class Unit(PlayerEntity, ABC):
         self.stop_completely()
         self.set_permanent_units_group()
         self.clear_all_blocked_nodes()
+        self.game.units_movement.remove(self.movement_slot)
         self.animate_and_communicate_unit_death()
         super().kill()
 
@@ -486,9 +528,9 @@ class Vehicle(Unit):
         self._load_textures()
         self.hit_box = self.texture.hit_box_points
 
-        thread_texture = f'{self.object_name}_threads.png'
-        # texture of the VehicleThreads left by this Vehicle
-        self.threads_texture = self.game.resources_manager.get(thread_texture)
+        threads_spritesheet = f'{self.object_name}_threads.png'
+        # textures of the threads left by this Vehicle, one for each direction
+        self.threads_textures = self.game.resources_manager.get_spritesheet(threads_spritesheet, columns=ROTATIONS)[0]
         # when this Vehicle left its threads on the ground last time:
         self.threads_time = 0
 
@@ -500,11 +542,7 @@ class Vehicle(Unit):
         return 200 / self.max_speed
 
     def _load_textures(self):
-        width, height = get_texture_size(self.full_name, columns=ROTATIONS)
-        self.textures = load_textures(
-            self.filename_with_path,
-            [(i * width, 0, width, height) for i in range(ROTATIONS)]
-        )
+        self.textures = self.game.resources_manager.get_spritesheet(self.full_name, columns=ROTATIONS)[0]
         # TODO: change 'textures' for Vehicle to 2d list to show: 1. current_activity, and 2. facing_direction
         self.set_texture(self.facing_direction)
 
@@ -512,7 +550,7 @@ class Vehicle(Unit):
         super().on_update(delta_time)
         if self.is_moving:
             self.consume_fuel()
-            if self.is_rendered and self.game.settings.vehicles_threads and self.threads_texture is not None:
+            if self.is_rendered and self.game.settings.vehicles_threads:
                 self.leave_threads()
 
     def consume_fuel(self):
@@ -521,7 +559,7 @@ class Vehicle(Unit):
     def leave_threads(self):
         if (t := self.timer.frames) - self.threads_time >= self.threads_frequency:
             self.threads_time = t
-            self.game.vehicles_threads.append(VehicleThreads(self.threads_texture, self.facing_direction, *self.position))
+            self.game.vehicles_threads.add(self.threads_textures[self.facing_direction], *self.position)
 
     @ignore_in_editor_mode
     def animate_and_communicate_unit_death(self):
@@ -538,21 +576,6 @@ class Vehicle(Unit):
         ]
 
 
-class VehicleThreads(Sprite):
-    """Creates a VehicleThreads sprite."""
-
-    def __init__(self, texture, index, x, y):
-        super().__init__(texture, center_x=x, center_y=y, hit_box_algorithm='None')
-        self.texture = load_texture(texture, index * 80, 0, 80, 21)
-
-    def on_update(self, delta_time: float = 1 / 60):
-        # threads slowly disappearing through time
-        if self.alpha:
-            self.alpha -= 1
-        else:
-            self.kill()
-
-
 class VehicleWithTurret(Vehicle):
     """An interface for all Units which are engine-powered vehicles, and which have a turret."""
 
@@ -568,10 +591,7 @@ class VehicleWithTurret(Vehicle):
         Create 16 lists of 16-texture spritesheets for each combination of hull
         and turret directions possible in game.
         """
-        width, height = get_texture_size(self.full_name, ROTATIONS, ROTATIONS)
-        self.textures = [load_textures(self.filename_with_path,
-            [(i * width, j * height, width, height) for i in range(ROTATIONS)]) for j in range(ROTATIONS)
-        ]
+        self.textures = self.game.resources_manager.get_spritesheet(self.full_name, ROTATIONS, ROTATIONS)
         # TODO: change 'textures' for Vehicle to 3d list to show:
         #  1. current_activity,
         #  2. facing_direction,
@@ -672,11 +692,10 @@ class Soldier(Unit):
         self._load_textures()
 
     def _load_textures(self):
-        texture_name = get_path_to_file(self.full_name)
-        width, height = get_texture_size(self.full_name, rows=ROTATIONS, columns=ROTATIONS)
+        spritesheet = self.game.resources_manager.get_spritesheet(self.full_name, ROTATIONS, ROTATIONS)
 
         self.all_textures = {
-            stance: self.load_pose_textures(texture_name, width, height, stance)
+            stance: self.load_pose_textures(spritesheet, stance)
             for stance in (UnitActivity.IDLE,)  # TODO: MOVE, CRAWL
         }
 
@@ -685,18 +704,9 @@ class Soldier(Unit):
         self.hit_box = self.texture.hit_box_points
 
     @staticmethod
-    def load_pose_textures(texture_name, width, height, stance):
+    def load_pose_textures(spritesheet: List[List[Texture]], stance: int) -> List[List[Texture]]:
         start = ROTATIONS * stance
-        return [
-            load_textures(
-                texture_name, [(i * width, j * height, width, height)
-                               for i in range(ROTATIONS)]
-            ) for j in range(start, start + ROTATIONS)
-        ]
-
-    @property
-    def should_be_rendered(self) -> bool:
-        return self.outside and super().should_be_rendered
+        return spritesheet[start:start + ROTATIONS]
 
     @property
     def is_controlled_by_human_player(self) -> bool:
@@ -704,7 +714,7 @@ class Soldier(Unit):
 
     def on_update(self, delta_time=1/60):
         super().on_update(delta_time)
-        if self.on_screen and self.is_moving:
+        if self.is_rendered and self.is_moving and not self.game.fast_forwarding:
             self.update_animation(delta_time)
 
     def angle_to_texture(self, angle_to_target: float):
@@ -729,14 +739,16 @@ class Soldier(Unit):
             self.game.units_manager.unselect(self)
         self.stop_rendering()
         self.stop_updating()
+        self.stop_observing()
+        self.game.units_movement.hide(self.movement_slot)
         building.on_soldier_enter(soldier=self)
 
     def leave_building(self, building):
         x, y = building.position  # TODO: replace this with Building exit position
         self.position = self.game.pathfinder.get_closest_walkable_position(x, y)
+        self.game.units_movement.place(self.movement_slot, *self.position)
         self.insert_to_map_quadtree()
         self.outside = True
-        self.start_rendering()
         self.start_updating()
 
     def restore_health(self):
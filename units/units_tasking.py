@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
+from logging import DEBUG
+
 from utils.game_logging import log_here
 from utils.scheduling import ScheduledEvent
 
@@ -36,7 +38,7 @@ class UnitTask:
         return f'{self.__class__.__name__} id: {id(self)}'
 
     def update(self):
-        log_here(f'Updating task: {self}, units: {self.units}', True)
+        log_here('Updating task: %s, units: %s', True, self, self.units, level=DEBUG)
         if self.check_if_task_is_completed():
             self.kill_task()
         else:
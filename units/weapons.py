@@ -1,8 +1,6 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
-from random import uniform
-
 from typing import List
 
 from arcade.texture import Texture
@@ -10,16 +8,6 @@ from arcade.texture import Texture
 from effects.sound import SOUNDS_EXTENSION
 from players_and_factions.player import PlayerEntity
 
-EXPERIENCE_HIT_CHANCE_BONUS = 0.05
-
-INFANTRY_HIT_CHANCE_PENALTY = -25
-
-TARGET_MOVEMENT_HIT_PENALTY = -15
-
-MOVEMENT_HIT_PENALTY = -25
-
-BUILDING_HIT_CHANCE_BONUS = 25
-
 
 class Weapon:
     """Spawn a Weapon instance for each Unit you want to be able to fight."""
@@ -48,13 +36,11 @@ class Weapon:
     def reloaded(self) -> bool:
         return self.owner.timer.total_game_time >= self.next_firing_time and self.ammunition
 
-    def shoot(self, target: PlayerEntity) -> float:
+    def shoot(self, target: PlayerEntity):
+        """Fire at the target, the shot is resolved later by the CombatResolver."""
         self.next_firing_time = self.owner.timer.total_game_time + self.rate_of_fire
         self.consume_ammunition()
-        self.create_shot_audio_visual_effects()
-        if self.check_if_target_was_hit(target):
-            return target.on_being_damaged(self.damage, self.penetration)
-        return 0
+        self.owner.game.combat.add_shot(self, target)
 
     def consume_ammunition(self, burst_size: int = 1):
         if self.magazine_size:
@@ -64,22 +50,6 @@ class Weapon:
                 self.next_firing_time += (self.rate_of_fire * 4)
         self.ammunition = max(0, self.ammunition - 1)
 
-    def check_if_target_was_hit(self, target: PlayerEntity) -> bool:
-        # we use that booleans are integers we can multiply by other values to avoid if statements
-        hit_chance = sum(
-            (
-                self.accuracy,
-                -target.cover,
-                self.owner.experience * EXPERIENCE_HIT_CHANCE_BONUS,
-                -target.experience * EXPERIENCE_HIT_CHANCE_BONUS,
-                BUILDING_HIT_CHANCE_BONUS * target.is_building,
-                MOVEMENT_HIT_PENALTY * self.owner.is_moving,
-                TARGET_MOVEMENT_HIT_PENALTY * target.is_moving,
-                INFANTRY_HIT_CHANCE_PENALTY * (target.is_infantry - self.owner.is_infantry)
-            )
-        )
-        return uniform(0, 100) < hit_chance
-
     def create_shot_audio_visual_effects(self):
         x, y = self.owner.center_x, self.owner.center_y + 10
         self.owner.game.sound_player.play_sound(self.shot_sound, sound_position=(x, y))
@@ -62,7 +62,7 @@ class MiniMap:
 
         self.visible = set()
 
-        self.reveal_minimap_area(self.game.fog_of_war.explored)
+        self.reveal_minimap_area(set(self.game.fog_of_war.explored_grids()))
 
     def set_map_to_mini_map_ratio(self) -> float:
         """
@@ -70,7 +70,7 @@ class Hierarchical:
                 try:
                     parent.add_child(self)
                 except Exception as e:
-                    log_here(str(e))
+                    log_here(str(e), exc_info=True)
 
     @property
     def parent(self):
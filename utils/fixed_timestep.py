@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+
+class FixedTimestep:
+    """
+    Accumulates time elapsed between rendered frames and tells how many
+    simulation ticks of fixed duration should be run in the current frame,
+    so the game logic advances in equal, deterministic steps regardless of
+    the frame rate. The part of the tick left in the accumulator is exposed
+    as 'interpolation' to draw moving objects between the last two ticks.
+
+    Simulation rate is read from the Settings each frame. When a frame took
+    so long, that more than 'max_ticks_per_frame' ticks would be required to
+    catch up, the surplus time is dropped, and simulation slows down instead
+    of spending even more time on the next frame.
+
+    In the turbo mode elapsed time is ignored, and 'turbo_ticks' ticks are run
+    in each frame instead. Their number grows up to the turbo_ticks_per_frame
+    setting, and backs off when ticks of the frame took longer than the
+    turbo_frame_budget, reported with adjust_turbo().
+    """
+
+    def __init__(self, settings, max_ticks_per_frame: int = 5):
+        self.settings = settings
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0.0
+        self.ticks = 0
+        self.turbo_ticks = 1
+
+    @property
+    def tick_duration(self) -> float:
+        return 1 / self.settings.simulation_rate
+
+    @property
+    def interpolation(self) -> float:
+        return min(self.accumulator / self.tick_duration, 1.0)
+
+    def advance(self, delta_time: float) -> int:
+        if self.settings.turbo_mode:
+            self.accumulator = 0.0
+            self.ticks += self.turbo_ticks
+            return self.turbo_ticks
+        tick_duration = self.tick_duration
+        self.accumulator += delta_time
+        ticks = int(self.accumulator // tick_duration)
+        if ticks > self.max_ticks_per_frame:
+            ticks = self.max_ticks_per_frame
+            self.accumulator = tick_duration * ticks
+        self.accumulator -= tick_duration * ticks
+        self.ticks += ticks
+        return ticks
+
+    def adjust_turbo(self, elapsed: float):
+        budget = self.settings.turbo_frame_budget
+        if elapsed > budget:
+            self.turbo_ticks = max(1, int(self.turbo_ticks * budget / elapsed))
+        elif self.turbo_ticks < self.settings.turbo_ticks_per_frame:
+            self.turbo_ticks += 1
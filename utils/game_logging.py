@@ -1,50 +1,130 @@
 #!/usr/bin/env python
 
+import atexit
 import logging
-from typing import Union
+import sys
+import traceback
+from functools import wraps
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from time import monotonic
+from typing import Dict, List, Optional, Tuple, Union
+
+# log each call of functions decorated with log_this_call(console=False), if
+# disabled, decorator returns undecorated function:
+LOG_CALLS = False
+
+# messages logged from the same line of code more than RATE_LIMIT times in
+# RATE_LIMIT_PERIOD seconds are dropped, and their number is reported later:
+RATE_LIMIT = 20
+RATE_LIMIT_PERIOD = 1.0
 
 
 console_handler = logging.StreamHandler()
+console_handler.addFilter(lambda record: getattr(record, 'console', False))
 file_handler = logging.FileHandler(
     'resources/logging/logfile.txt',
     'w'
 )
 
 
-file_logger = logging.getLogger('file_handler')
-file_logger.addHandler(file_handler)
-file_logger.setLevel(logging.INFO)
-
-console_logger = logging.getLogger('console_handler')
-console_logger.addHandler(console_handler)
-console_logger.setLevel(logging.INFO)
-
-
 log_formatter = logging.Formatter(
-    '%(levelname)s: %(asctime)s %(message)s',
+    '%(levelname)s: %(asctime)s | %(module)s, %(lineno)d, %(funcName)s | %(message)s',
     '%m/%d/%Y %I:%M:%S %p'
 )
-for logger in (console_logger, file_logger):
-    for handler in logger.handlers:
-        handler.setFormatter(log_formatter)
+for handler in (console_handler, file_handler):
+    handler.setFormatter(log_formatter)
+
+
+log_queue = SimpleQueue()
+game_logger = logging.getLogger('game')
+game_logger.setLevel(logging.INFO)
+game_logger.propagate = False
+# QueueHandler merges message with its args on the calling thread, so the
+# message shows state of the logged objects at the time of the call, and the
+# writer thread never touches live game objects:
+game_logger.addHandler(QueueHandler(log_queue))
+
+log_writer = QueueListener(log_queue, file_handler, console_handler)
+log_writer.start()
+atexit.register(log_writer.stop)
+
+modules_loggers: Dict[str, logging.Logger] = {}
+rate_limits: Dict[Tuple[str, int], List] = {}  # [period start, messages count]
+
 
+def get_module_logger(module: str) -> logging.Logger:
+    try:
+        return modules_loggers[module]
+    except KeyError:
+        logger = modules_loggers[module] = game_logger.getChild(module)
+        return logger
 
-def log_here(logged_message: str, console: Union[int, bool] = False):
-    full_file_path, line_number, function, stack = logger.findCaller()
-    filename = full_file_path.split('\\')[-1]
-    message = f' | {filename, line_number, function, stack} | {logged_message}'
-    file_logger.info(message, exc_info=True)
-    if console:
-        console_logger.info(message, exc_info=True)
+
+def set_logging_level(level: int, module: Optional[str] = None):
+    """Set level of messages logged from the module, or from all modules, if no module is given."""
+    (game_logger if module is None else get_module_logger(module)).setLevel(level)
+
+
+def count_suppressed_messages(key: Tuple[str, int]) -> Optional[int]:
+    """
+    Return None if message from this line should be dropped, else number of the
+    messages from this line dropped in the previous period.
+    """
+    now = monotonic()
+    if (limit := rate_limits.get(key)) is None or now - limit[0] > RATE_LIMIT_PERIOD:
+        rate_limits[key] = [now, 1]
+        return 0 if limit is None else max(0, limit[1] - RATE_LIMIT)
+    limit[1] += 1
+    return None if limit[1] > RATE_LIMIT else 0
+
+
+def log_here(logged_message: str,
+             console: Union[int, bool] = False,
+             *args,
+             level: int = logging.INFO,
+             exc_info: bool = False,
+             stack_info: bool = False):
+    """
+    Log the message from the module of the caller. Message is %-formatted with
+    the args only if it is logged, so pass the args instead of formatting the
+    message in the hot code. Messages below the level set for the module are
+    dropped before the LogRecord is created.
+
+    :param console: bool -- print the message in console too
+    :param exc_info: bool -- add the information about handled exception
+    :param stack_info: bool -- add the stack of the caller
+    """
+    frame = sys._getframe(1)
+    logger = get_module_logger(frame.f_globals.get('__name__', '__main__'))
+    if not logger.isEnabledFor(level):
+        return
+    code = frame.f_code
+    if (suppressed := count_suppressed_messages((code.co_filename, frame.f_lineno))) is None:
+        return
+    if suppressed:
+        logged_message = f'{logged_message} ({suppressed} similar messages were suppressed)'
+    record = logger.makeRecord(
+        logger.name, level, code.co_filename, frame.f_lineno, logged_message, args,
+        sys.exc_info() if exc_info else None, code.co_name,
+        {'console': bool(console)},
+        ''.join(traceback.format_stack(frame)) if stack_info else None
+    )
+    logger.handle(record)
 
 
 def log_this_call(console=False):
-    """Decorator for logging function calls."""
+    """
+    Decorator for logging function calls. Calls logged only to the file are
+    logged when LOG_CALLS is True, otherwise function is left undecorated.
+    """
     def decorator(func):
+        if not (console or LOG_CALLS):
+            return func
+
+        @wraps(func)
         def wrapper(*args, **kwargs):
-            log_here(f'func: {func.__name__} args: {args}, kwargs: {kwargs}', console)
+            log_here('func: %s args: %s, kwargs: %s', console, func.__name__, args, kwargs)
             return func(*args, **kwargs)
         return wrapper
     return decorator
-
-
@@ -1,10 +1,19 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
-from typing import Dict, Optional, Union, Iterable, Iterator
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Union, Iterable, Iterator
 
 from arcade import SpriteList, Sprite
 
+from map.viewport_chunks import ChunkPosition, ViewportChunks, position_to_chunk
+from utils.constants import TILE_HEIGHT
+from utils.level_of_detail import UpdateLevelOfDetail
+
+# GameObjects are drawn in the layer of the map row of their centre, but tall
+# Sprites, e.g. Buildings, reach this many rows above and below it:
+DRAWN_ROWS_MARGIN = 3
+
 
 class SpriteListWithSwitch(SpriteList):
     """
@@ -46,6 +55,83 @@ class SpriteListWithSwitch(SpriteList):
         self.draw_on = not self.draw_on
 
 
+class ChunkedSpriteList:
+    """
+    Container for Sprites which never move, e.g. terrain tiles and trees,
+    keeping them in separate static SpriteLists for each map chunk, so only
+    chunks visible in the current viewport are drawn. Visible chunks are
+    provided by the shared ViewportChunks instance.
+    """
+
+    def __init__(self, viewport_chunks: ViewportChunks, update_on=True, draw_on=True):
+        self.viewport_chunks = viewport_chunks
+        self.chunks: Dict[ChunkPosition, SpriteListWithSwitch] = {}
+        self.update_on = update_on
+        self.draw_on = draw_on
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self.chunks.values())
+
+    def __iter__(self) -> Iterator[Sprite]:
+        for chunk in list(self.chunks.values()):
+            yield from chunk
+
+    def __contains__(self, sprite: Sprite) -> bool:
+        chunk = self.chunks.get(position_to_chunk(*sprite.position))
+        return chunk is not None and sprite in chunk
+
+    def get(self, sprite_id: int) -> Optional[Sprite]:
+        for chunk in self.chunks.values():
+            if (sprite := chunk.get_by_id(sprite_id)) is not None:
+                return sprite
+
+    def append(self, sprite: Sprite):
+        chunk_position = position_to_chunk(*sprite.position)
+        if (chunk := self.chunks.get(chunk_position)) is None:
+            self.chunks[chunk_position] = chunk = SpriteListWithSwitch(is_static=True)
+        chunk.append(sprite)
+
+    def extend(self, sprites: Iterable[Sprite]):
+        for sprite in sprites:
+            self.append(sprite)
+
+    def remove(self, sprite: Sprite):
+        chunk_position = position_to_chunk(*sprite.position)
+        chunk = self.chunks[chunk_position]
+        chunk.remove(sprite)
+        if not chunk:
+            del self.chunks[chunk_position]
+
+    def visible_sprites_count(self) -> int:
+        if not self.draw_on:
+            return 0
+        chunks = self.chunks
+        return sum(len(chunks.get(position, ())) for position in self.viewport_chunks.visible)
+
+    def on_update(self, delta_time: float = 1/60):
+        if self.update_on:
+            for chunk in self.chunks.values():
+                chunk.on_update(delta_time)
+
+    def update(self):
+        if self.update_on:
+            for chunk in self.chunks.values():
+                chunk.update()
+
+    def draw(self, **kwargs):
+        if self.draw_on:
+            chunks = self.chunks
+            for chunk_position in self.viewport_chunks.visible:
+                if (chunk := chunks.get(chunk_position)) is not None:
+                    chunk.draw(**kwargs)
+
+    def toggle_update(self):
+        self.update_on = not self.update_on
+
+    def toggle_draw(self):
+        self.draw_on = not self.draw_on
+
+
 # noinspection PyUnresolvedReferences
 class LayeredSpriteList(SpriteList):
     """
@@ -57,29 +143,43 @@ class LayeredSpriteList(SpriteList):
     the chosen Sprite as parameter.
     LayeredSpritelist also maintains hashmap of all Sprites which allows for
     fast lookups by their 'id' attribute.
+
+    Sprites are drawn in the order of map rows they stand in, from the top of
+    the map to the bottom, so the closer ones are drawn over the farther ones.
+    Each row keeps its Sprites in its own SpriteList - a rendering layer - and
+    layers are drawn one after another, so a GameObject changing its row is
+    moved only between two small SpriteLists, and nothing is sorted. This
+    SpriteList itself is never drawn, and serves for iterating and lookups.
+    If the shared ViewportChunks instance is provided, only the layers of the
+    rows inside the viewport are drawn.
     """
-    game = None
 
     def __init__(self,
                  use_spatial_hash=False,
                  spatial_hash_cell_size=128,
                  is_static=False,
                  update_on=True,
-                 draw_on=True):
+                 draw_on=True,
+                 update_lod: Optional[UpdateLevelOfDetail] = None,
+                 viewport_chunks: Optional[ViewportChunks] = None):
         super().__init__(use_spatial_hash, spatial_hash_cell_size, is_static)
+        self.viewport_chunks = viewport_chunks
         self.game_objects: Dict[int, GameObject] = {}
-
-        # layers are ordering Sprites spatially from top of the map to bottom
-        # what allows rendering them in reversed way to avoid Sprites being
-        # 'closer' to the player'spoint of view being obstructed by those which
-        # are more distant
-        # self.rendering_layers = self.create_rendering_layers()
+        # if provided, it decides which GameObjects are updated each frame:
+        self.update_lod = update_lod
+
+        # map row -> SpriteList of the GameObjects in this row, layers are
+        # kept when emptied, so the rows order changes only when a GameObject
+        # enters a row for the first time:
+        self.rendering_layers: Dict[int, SpriteList] = {}
+        self.rendering_layer_of: Dict[int, int] = {}  # GameObject.id -> row
+        self.rows_in_drawing_order: List[int] = []  # from the top of the map
+        # GameObjects drawing something more than their Sprite, e.g.
+        # ConstructionSites drawing their progress bars:
+        self.drawn_separately: Dict[GameObject, None] = {}
         self.update_on = update_on
         self.draw_on = draw_on
 
-    def create_rendering_layers(self) -> List[List]:
-        return [[] for _ in range(self.game.settings.map_height)]
-
     def get(self, game_object_id: int) -> Optional[Sprite]:
         return self.game_objects.get(game_object_id)
 
@@ -94,69 +194,84 @@ class LayeredSpriteList(SpriteList):
         if game_object.id not in self.game_objects:
             self.game_objects[game_object.id] = game_object
             super().append(game_object)
+            self.add_to_rendering_layer(game_object)
+            if game_object.drawn_separately:
+                self.drawn_separately[game_object] = None
 
     def add_to_rendering_layer(self, game_object: GameObject) -> None:
-        pass
-        # try:
-        #     self.rendering_layers[sprite.current_node.grid[1]].append(sprite)
-        # except (AttributeError, ValueError):
-        #     pass
-
-    def swap_rendering_layers(self, game_object: GameObject, old_layer: int, new_layer: int) -> None:
-        pass
-        # try:
-        #     self.rendering_layers[old_layer].remove(sprite)
-        # except ValueError:
-        #     pass
-        # finally:
-        #     self.rendering_layers[new_layer].append(sprite)
+        self.swap_rendering_layers(game_object, int(game_object.center_y // TILE_HEIGHT))
+
+    def swap_rendering_layers(self, game_object: GameObject, new_layer: int) -> None:
+        """Move the GameObject to the rendering layer of the new map row."""
+        if (layer := self.rendering_layer_of.get(game_object.id)) == new_layer:
+            return
+        if layer is not None:
+            self.remove_from_layer(game_object, layer)
+        elif game_object.id not in self.game_objects:
+            return
+        if (sprites := self.rendering_layers.get(new_layer)) is None:
+            self.rendering_layers[new_layer] = sprites = SpriteList()
+            insort(self.rows_in_drawing_order, new_layer, key=lambda row: -row)
+        sprites.append(game_object)
+        self.rendering_layer_of[game_object.id] = new_layer
 
     def remove(self, game_object: GameObject) -> None:
         try:
             del self.game_objects[game_object.id]
             super().remove(game_object)
             game_object.layered_spritelist = None
-            if game_object.is_rendered:
-                self.rendered.remove(game_object)
+            self.remove_from_rendering_layer(game_object)
+            self.drawn_separately.pop(game_object, None)
         except KeyError:
             pass
 
     def remove_from_rendering_layer(self, game_object: GameObject) -> None:
-        pass
-        # try:
-        #     self.rendering_layers[sprite.current_node.grid[1]].remove(sprite)
-        # except (AttributeError, ValueError):
-        #     if sprite.is_building:
-        #         for layer in (l for l in self.rendering_layers if sprite in l):
-        #             layer.remove(sprite)
+        if (layer := self.rendering_layer_of.pop(game_object.id, None)) is not None:
+            self.remove_from_layer(game_object, layer)
+
+    def remove_from_layer(self, game_object: GameObject, layer: int):
+        if (sprites := self.rendering_layers[layer]) in game_object.sprite_lists:
+            sprites.remove(game_object)
 
     def extend(self, game_objects: Iterable[GameObject]) -> None:
         for game_object in game_objects:
             self.append(game_object)
 
     def on_update(self, delta_time: float = 1/60) -> None:
-        if self.update_on:
+        if not self.update_on:
+            return
+        if self.update_lod is not None:
+            self.update_lod.update((gobj for gobj in self if gobj.is_updated), delta_time)
+        else:
             for game_object in (gobj for gobj in self if gobj.is_updated):
                 game_object.on_update(delta_time)
 
     def draw(self) -> None:
         if self.draw_on:
-            super().draw()
-            self.draw_buildings()
-
-    def draw_buildings(self):
-        if any(game_object.is_building for game_object in self.game_objects.values()):
-            for building in self:
-                building.draw()
-
-            # for layer in self.rendering_layers[::-1]:  # from bottom to top
-            #     for sprite in (s for s in layer if s.is_rendered):
-            #         sprite.draw()
-
-    def pop(self, index: int = -1) -> Sprite:
-        game_object = super().pop(index)
-        del self.game_objects[game_object.id]
-        # self.remove_from_rendering_layer(game_object)
+            layers = self.rendering_layers
+            for row in self.visible_rows():
+                layers[row].draw()
+            self.draw_separately_drawn()
+
+    def visible_rows(self) -> List[int]:
+        rows = self.rows_in_drawing_order
+        if self.viewport_chunks is None or (viewport := self.viewport_chunks.viewport) is None:
+            return rows
+        _, _, bottom, top = viewport
+        top_row = int(top // TILE_HEIGHT) + DRAWN_ROWS_MARGIN
+        bottom_row = int(bottom // TILE_HEIGHT) - DRAWN_ROWS_MARGIN
+        # rows are sorted descending, so they are bisected by their negations:
+        first = bisect_left(rows, -top_row, key=lambda row: -row)
+        last = bisect_right(rows, -bottom_row, key=lambda row: -row)
+        return rows[first:last]
+
+    def draw_separately_drawn(self):
+        for game_object in self.drawn_separately:
+            game_object.draw()
+
+    def pop(self, index: int = -1) -> GameObject:
+        game_object = self.sprite_list[index]
+        self.remove(game_object)
         return game_object
 
     def clear(self) -> None:
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import json
+import os
+
+from contextlib import nullcontext
+from threading import Thread
+from time import perf_counter, strftime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.game_logging import log_here
+
+# number of the last frames kept in the timings history of each span:
+HISTORY_SIZE = 120
+
+# number of the last spans kept by the TraceRecorder:
+TRACE_CAPACITY = 1 << 16
+
+DISABLED_SPAN = nullcontext()
+
+
+class Span:
+    """
+    Context manager measuring the time spent inside its block. All measurements
+    made during the frame are summed, and at the end of the frame the total is
+    written to the ring-buffer of the last HISTORY_SIZE frames.
+
+    Span can be entered again before it was exited, e.g. by a recursive call
+    of the timed function, so start times are kept on a stack. Only the
+    outermost block adds to the frame total, to not count the same time twice.
+    """
+    __slots__ = ('name', 'starts', 'current', 'history', 'trace')
+
+    def __init__(self, name: str, trace: Optional[TraceRecorder] = None):
+        self.name = name
+        self.starts: List[float] = []
+        self.current = 0.0
+        self.history = np.zeros(HISTORY_SIZE, dtype=np.float64)
+        self.trace = trace
+
+    def __enter__(self) -> Span:
+        self.starts.append(perf_counter())
+        return self
+
+    def __exit__(self, *exc_info):
+        end = perf_counter()
+        start = self.starts.pop()
+        if not self.starts:
+            self.current += end - start
+        if self.trace is not None:
+            self.trace.record(self.name, start, end)
+
+    def end_frame(self, slot: int):
+        self.history[slot] = self.current
+        self.current = 0.0
+
+    def statistics(self, frames: int) -> Tuple[float, float, float]:
+        """Return mean, 95th percentile and max time of the recorded frames in milliseconds."""
+        if not frames:
+            return 0.0, 0.0, 0.0
+        recorded = self.history[:min(frames, HISTORY_SIZE)] * 1000
+        return float(recorded.mean()), float(np.percentile(recorded, 95)), float(recorded.max())
+
+
+class TraceRecorder:
+    """
+    Ring-buffer of the last 'capacity' spans, each kept as its name and the
+    time of its beginning and end. Spans which ended in the last seconds can be
+    dumped to the file in the Chrome trace JSON format, which can be opened in
+    the chrome://tracing or in the Perfetto UI to see the timeline of frames.
+    """
+
+    def __init__(self, capacity: int = TRACE_CAPACITY):
+        self.capacity = capacity
+        self.names: List[Optional[str]] = [None] * capacity
+        self.starts: List[float] = [0.0] * capacity
+        self.ends: List[float] = [0.0] * capacity
+        self.next_slot = 0
+        self.last_dump_time = -float('inf')
+
+    def record(self, name: str, start: float, end: float):
+        slot = self.next_slot
+        self.names[slot] = name
+        self.starts[slot] = start
+        self.ends[slot] = end
+        self.next_slot = (slot + 1) % self.capacity
+
+    def events(self, seconds: float) -> List[Dict]:
+        """Return spans which ended in the last seconds as Chrome trace 'complete' events."""
+        return self.to_events(self.names, self.starts, self.ends, perf_counter() - seconds)
+
+    @staticmethod
+    def to_events(names: List[Optional[str]], starts: List[float], ends: List[float], since: float) -> List[Dict]:
+        return [
+            {'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': (end - start) * 1e6, 'pid': 1, 'tid': 1}
+            for name, start, end in zip(names, starts, ends)
+            if name is not None and end >= since
+        ]
+
+    def dump(self, seconds: float, directory: str = 'resources/logging') -> str:
+        """
+        Copy the buffers and leave filtering the spans of the last seconds and
+        writing them to the file to the background thread, so dumping does not
+        make the hitch even longer.
+        """
+        self.last_dump_time = now = perf_counter()
+        path = os.path.join(directory, f'trace_{strftime("%Y%m%d_%H%M%S")}.json')
+        buffers = self.names[:], self.starts[:], self.ends[:]
+        Thread(target=self.write, args=(buffers, now - seconds, path), daemon=True).start()
+        log_here('Dumped trace of the last %s seconds to: %s', True, seconds, path)
+        return path
+
+    @classmethod
+    def write(cls, buffers: Tuple[List, List, List], since: float, path: str):
+        trace = {'traceEvents': cls.to_events(*buffers, since), 'displayTimeUnit': 'ms'}
+        with open(path, 'w') as file:
+            json.dump(trace, file)
+
+
+class Instrumentation:
+    """
+    Named spans timing the phases of each frame, and counters of the work done
+    in the frame, e.g. number of path requests or entities updated. Measurements
+    can be displayed as on-screen overlay with the report() lines.
+
+    When trace recording is started, spans are recorded by the TraceRecorder
+    too, with the whole frames, and the trace of the last 'trace_seconds' is
+    dumped automatically each time a frame took longer than 'hitch_threshold'.
+
+    When disabled, span() returns the shared, empty context manager and count()
+    returns immediately, so instrumented code costs almost nothing.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.spans: Dict[str, Span] = {}
+        self.counters: Dict[str, int] = {}
+        self.last_frame_counters: Dict[str, int] = {}
+        self.frames = 0
+        self.trace: Optional[TraceRecorder] = None
+        self.trace_seconds = 10.0
+        self.hitch_threshold = 0.1
+        self.frame_start = perf_counter()
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.reset()
+
+    def reset(self):
+        self.spans.clear()
+        self.counters.clear()
+        self.last_frame_counters = {}
+        self.frames = 0
+
+    def start_trace(self, trace_seconds: float, hitch_threshold: float):
+        self.trace = trace = TraceRecorder()
+        self.trace_seconds = trace_seconds
+        self.hitch_threshold = hitch_threshold
+        self.frame_start = perf_counter()
+        for span in self.spans.values():
+            span.trace = trace
+
+    def stop_trace(self):
+        self.trace = None
+        for span in self.spans.values():
+            span.trace = None
+
+    def span(self, name: str):
+        if not (self.enabled or self.trace is not None):
+            return DISABLED_SPAN
+        if (span := self.spans.get(name)) is None:
+            self.spans[name] = span = Span(name, self.trace)
+        return span
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def end_frame(self):
+        if not (self.enabled or self.trace is not None):
+            return
+        if (trace := self.trace) is not None:
+            self.trace_frame(trace)
+        slot = self.frames % HISTORY_SIZE
+        for span in self.spans.values():
+            span.end_frame(slot)
+        self.last_frame_counters, self.counters = self.counters, {}
+        self.frames += 1
+
+    def trace_frame(self, trace: TraceRecorder):
+        start, now = self.frame_start, perf_counter()
+        self.frame_start = now
+        trace.record('frame', start, now)
+        if now - start > self.hitch_threshold and now - trace.last_dump_time > self.trace_seconds:
+            trace.dump(self.trace_seconds)
+
+    def report(self) -> List[str]:
+        lines = []
+        for name, span in self.spans.items():
+            mean, p95, maximum = span.statistics(self.frames)
+            lines.append(f'{name}: {mean:.2f} ms (p95: {p95:.2f}, max: {maximum:.2f})')
+        for name, value in self.last_frame_counters.items():
+            lines.append(f'{name}: {value}')
+        return lines
+
+
+# shared registry, used by the GameWindow and by the timer decorator:
+metrics = Instrumentation()
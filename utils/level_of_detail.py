@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+from enum import IntEnum
+from math import ceil
+from typing import Dict, Iterable, List, Set
+
+from map.viewport_chunks import CHUNK_HEIGHT, ChunkPosition, position_to_chunk
+
+
+class UpdateTier(IntEnum):
+    FULL = 0  # on-screen or fighting entities, updated each frame
+    REDUCED = 1  # off-screen moving entities
+    IDLE = 2  # off-screen entities doing nothing
+
+
+def select_update_tier(in_action: bool, travelling: bool) -> UpdateTier:
+    """
+    :param in_action: bool -- entity is on-screen or fighting
+    :param travelling: bool -- entity is on its way somewhere, even if it is
+    stopped for a moment, e.g. at the waypoint or while rotating
+    """
+    if in_action:
+        return UpdateTier.FULL
+    return UpdateTier.REDUCED if travelling else UpdateTier.IDLE
+
+
+class UpdateLevelOfDetail:
+    """
+    Decides which GameObjects are updated in the current frame, basing on the
+    UpdateTier each GameObject reports with its 'update_tier' property. Each
+    tier is updated every 'interval' frames, and updates of entities sharing
+    the tier are spread evenly among frames with their ids. Time of skipped
+    frames is accumulated in the GameObject.skipped_time, so the entity gets
+    the whole elapsed time as delta_time when it is finally updated.
+
+    Intervals are read from the Settings each frame, so they can be changed
+    during the game. Counters of entities in each tier and of updates done in
+    the last frame are kept for the debugging and profiling.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.frame = 0
+        self.entities_count: List[int] = [0] * len(UpdateTier)
+        self.updates_count: List[int] = [0] * len(UpdateTier)
+
+    @property
+    def intervals(self) -> List[int]:
+        settings = self.settings
+        if not settings.update_lod:
+            return [1] * len(UpdateTier)
+        return [1, max(1, settings.lod_reduced_interval), max(1, settings.lod_idle_interval)]
+
+    def update(self, game_objects: Iterable, delta_time: float):
+        self.frame = frame = self.frame + 1
+        intervals = self.intervals
+        entities_count = [0] * len(UpdateTier)
+        updates_count = [0] * len(UpdateTier)
+        for game_object in game_objects:
+            tier = game_object.update_tier
+            entities_count[tier] += 1
+            elapsed = game_object.skipped_time + delta_time
+            if (frame + game_object.id) % intervals[tier]:
+                game_object.skipped_time = elapsed
+            else:
+                game_object.skipped_time = 0.0
+                game_object.on_update(elapsed)
+                updates_count[tier] += 1
+        self.entities_count = entities_count
+        self.updates_count = updates_count
+
+
+class SleepingEntities:
+    """
+    Spatial index of the PlayerEntities which fell asleep, stored in the map
+    chunks. Sleeping entity skips its whole logic update until it is woken up
+    by a move order, damage, its own ScheduledEvent or an enemy moving or being
+    built close enough to be noticed. Visibility ranges can be longer than the
+    chunk, so the number of chunks checked around the enemy is computed from
+    the greatest 'visibility_radius' of the entities which ever fell asleep.
+    """
+
+    def __init__(self):
+        self.cells: Dict[ChunkPosition, Set] = {}
+        # how many chunks around the enemy must be checked for the sleepers
+        # which could see it:
+        self.reach = 1
+
+    def __len__(self) -> int:
+        return sum(len(sleepers) for sleepers in self.cells.values())
+
+    def __contains__(self, entity) -> bool:
+        return entity in self.cells.get(position_to_chunk(*entity.position), ())
+
+    def add(self, entity):
+        chunk = position_to_chunk(*entity.position)
+        if (sleepers := self.cells.get(chunk)) is None:
+            self.cells[chunk] = sleepers = set()
+        sleepers.add(entity)
+        # chunks are lower than wide, so their height limits the reach:
+        self.reach = max(self.reach, ceil(entity.visibility_radius / CHUNK_HEIGHT))
+
+    def discard(self, entity):
+        chunk = position_to_chunk(*entity.position)
+        if (sleepers := self.cells.get(chunk)) is not None:
+            sleepers.discard(entity)
+            if not sleepers:
+                del self.cells[chunk]
+
+    def wake_enemies_near(self, entity):
+        if not self.cells:
+            return
+        cx, cy = position_to_chunk(*entity.position)
+        reach = self.reach
+        for x in range(cx - reach, cx + reach + 1):
+            for y in range(cy - reach, cy + reach + 1):
+                if (sleepers := self.cells.get((x, y))) is not None:
+                    for sleeper in [s for s in sleepers if entity.is_enemy(s)]:
+                        sleeper.wake_up()
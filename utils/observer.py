@@ -5,6 +5,31 @@ from collections import defaultdict
 from typing import Optional, List, DefaultDict, Any
 
 
+class ObservedAttribute:
+    """
+    Declare in the class body of the Observed subclass each attribute, which
+    Observers could be interested in, e.g.: 'health = ObservedAttribute()'.
+    Only setting such attribute notifies Observers attached to it, and all the
+    other attributes are set without any overhead.
+    """
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, instance: Optional[Observed], owner: type):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, instance: Observed, value: Any):
+        instance.__dict__[self.name] = value
+        if (observers := instance.__dict__.get('observed_attributes')) and self.name in observers:
+            instance.notify_all_observers(self.name, value)
+
+
 class Observed:
     """
     My implementation of Observer pattern which allows to notify observers when
@@ -14,6 +39,8 @@ class Observed:
     an 'general' Observer, which is notified only, when subject is deleted.
     How the 'deletion' is interpreted is up to the user - it could be when
     __del__ method is called, or when Observed is removed from some collection.
+
+    Observable attributes must be declared with ObservedAttribute descriptors.
     """
 
     def __init__(self, observers: Optional[List[Observer]] = None):
@@ -21,15 +48,6 @@ class Observed:
         if observers:
             self.attach_observers(observers=observers)
 
-    def __setattr__(self, key, value):
-        try:
-            if key in self.observed_attributes:
-                self.notify_all_observers(key, value)
-        except AttributeError:
-            pass  # happens only once, during __init__ when observed_attributes is not initialized yet
-        finally:
-            super().__setattr__(key, value)
-
     def notify_all_observers(self, key: str, value: Any):
         for observer in self.observed_attributes[key]:
             observer.notify(key, value)
@@ -41,6 +59,8 @@ class Observed:
     def attach(self, observer: Observer, *attributes: str):
         if attributes:
             for attribute in attributes:
+                if not isinstance(getattr(type(self), attribute, None), ObservedAttribute):
+                    raise AttributeError(f'{type(self).__name__}.{attribute} is not an ObservedAttribute')
                 self.observed_attributes[attribute].append(observer)
         else:
             self.observed_attributes['on_kill'].append(observer)
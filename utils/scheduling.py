@@ -1,6 +1,9 @@
 #!/usr/bin/env python
 from __future__ import annotations
 
+from heapq import heapify, heappop, heappush
+from logging import DEBUG
+from itertools import count
 from math import inf
 from typing import List, Tuple, Dict, Any, Optional, Callable, Union, Iterator
 
@@ -35,7 +38,7 @@ class ScheduledEvent:
         self.kwargs = kwargs or {}
         self.repeat = inf if repeat == -1 else repeat
         self.delay_left = delay_left
-        log_here(f'{self}')
+        log_here('%s', False, self, level=DEBUG)
 
     def __repr__(self):
         return (f'ScheduledEvent(creator: {self.creator.__class__.__name__}, '
@@ -47,7 +50,10 @@ class ScheduledEvent:
         try:
             self.function(*self.args, **self.kwargs)
         except Exception as e:
-            log_here(f'{self} failed to execute with exception: {str(e)}')
+            log_here('%s failed to execute with exception: %s', False, self, e, exc_info=True)
+        # sleeping PlayerEntities must react to their own events:
+        if (wake_up := getattr(self.creator, 'wake_up', None)) is not None:
+            wake_up()
 
     def shelve(self):
         return {
@@ -77,57 +83,95 @@ class EventsScheduler:
     checking each time if there are any events which should be executed. It
     replaces arcade schedule functions allowing to serialize and save scheduled
     events, which arcade does not offer.
+
+    Events are kept in the heap ordered by their execution time, so each update
+    only looks at the events which are due. Each scheduled event has its heap
+    entry: [execution_time, sequence_number, event], and unscheduling does not
+    search the heap, but just empties the entry, which is then dropped when it
+    reaches the top of the heap.
     """
     instance = None
 
     def __init__(self, game):
         self.game = game
-        self.execution_times: List[float] = []
-        self.scheduled_events: List[ScheduledEvent] = []
+        self.heap: List[List] = []
+        self.entries: Dict[ScheduledEvent, List] = {}
+        self.sequence = count()
         EventsScheduler.instance = self
 
     def __contains__(self, event: ScheduledEvent) -> bool:
-        return event in self.scheduled_events
+        return event in self.entries
 
     def __iter__(self) -> Iterator[ScheduledEvent]:
-        return self.scheduled_events.__iter__()
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
 
     @log_this_call()
     def schedule(self, event: ScheduledEvent):
-        delay = (event.delay_left or event.delay) + self.game.timer.total_game_time
-        self.scheduled_events.append(event)
-        self.execution_times.append(delay)
+        delay = event.delay if event.delay_left is None else event.delay_left
+        event.delay_left = None
+        self._push(event, self.game.timer.total_game_time + delay)
+
+    def _push(self, event: ScheduledEvent, execution_time: float):
+        if (scheduled := self.entries.get(event)) is not None:
+            self._unschedule(scheduled)
+        self.entries[event] = entry = [execution_time, next(self.sequence), event]
+        heappush(self.heap, entry)
 
     @log_this_call()
     def unschedule(self, event: ScheduledEvent):
-        self._unschedule(self.scheduled_events.index(event))
-
-    def _unschedule(self, event_index: int):
         try:
-            self.scheduled_events.pop(event_index)
-            self.execution_times.pop(event_index)
-        except IndexError as e:
-            log_here(f'Failed to unschedule ScheduledEvent due to: {e}', True)
+            self._unschedule(self.entries.pop(event))
+        except KeyError:
+            log_here(f'Failed to unschedule {event}, it is not scheduled', True)
+
+    def _unschedule(self, entry: List):
+        entry[-1] = None
+        if len(self.heap) > 2 * len(self.entries):
+            self.remove_cancelled_entries()
+
+    def remove_cancelled_entries(self):
+        self.heap = [entry for entry in self.heap if entry[-1] is not None]
+        heapify(self.heap)
 
     def update(self):
         time = self.game.timer.total_game_time
-        for i, event in enumerate(self.scheduled_events):
-            if time >= self.execution_times[i]:
-                event.execute()
-                if event.repeat:
-                    event.repeat -= 1
-                    self.execution_times[i] = time + event.delay
-                else:
-                    self._unschedule(i)
+        heap, due = self.heap, []
+        while heap and heap[0][0] <= time:
+            if (entry := heappop(heap))[-1] is not None:
+                due.append(entry)
+        for entry in due:
+            if (event := entry[-1]) is not None:
+                self.execute(event, entry, time)
+
+    def execute(self, event: ScheduledEvent, entry: List, time: float):
+        event.execute()
+        if entry[-1] is None:
+            return  # event was unscheduled or scheduled again by its function
+        if event.repeat:
+            event.repeat -= 1
+            self._push(event, time + event.delay)
+        else:
+            del self.entries[event]
+            self.forget_finished_event(event)
+
+    @staticmethod
+    def forget_finished_event(event: ScheduledEvent):
+        try:
+            event.creator.remove_event_from_scheduled_list(event)
+        except (AttributeError, ValueError):
+            pass
 
     def time_left_to_event_execution(self, event: ScheduledEvent) -> float:
-        return self.execution_times[self.scheduled_events.index(event)] - self.game.timer.total_game_time
+        return max(0.0, self.entries[event][0] - self.game.timer.total_game_time)
 
     def save(self) -> List[Dict]:
         return self.shelve_scheduled_events()
 
     def shelve_scheduled_events(self) -> List[Dict]:
-        return [event.shelve() for event in self.scheduled_events]
+        return [event.shelve() for event in self.entries]
 
     def load(self, shelved_events: List[Dict]):
         self.unshelve_scheduled_events(shelved_events)
@@ -137,9 +181,10 @@ class EventsScheduler:
             creator = self.game.find_object_by_class_and_id(shelved['creator'])
             delay = shelved['time_since_triggered']
             function = getattr(creator, shelved['function'])
-            self.schedule(
-                ScheduledEvent(creator, delay, function, *list(shelved.values())[3:])
-            )
+            event = ScheduledEvent(creator, delay, function, *list(shelved.values())[3:])
+            if isinstance(creator, EventsCreator):
+                creator.add_event_to_scheduled_list(event)
+            self.schedule(event)
 
 
 class EventsCreator:
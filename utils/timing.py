@@ -1,22 +1,25 @@
 #!/usr/bin/env python
-from time import perf_counter
+from functools import wraps
 
-from utils.game_logging import log_here
+from utils.instrumentation import metrics
 
 
 def timer(level=0, global_profiling_level=0, forced=False):
+    """
+    Profile the decorated function, if its level is not higher than the global
+    profiling level. Otherwise, function is returned undecorated, so disabled
+    profiling costs nothing. Profiled calls are timed with the span named after
+    the function in the shared metrics Instrumentation, and displayed with the
+    other spans when it is enabled.
+    """
     def decorator(func):
+        if not (forced or level <= global_profiling_level):
+            return func
+        name = func.__qualname__
+
+        @wraps(func)
         def wrapper(*args, **kwargs):
-            if forced or level <= global_profiling_level:
-                try:
-                    start_time = perf_counter()
-                    result = func(*args, **kwargs)
-                    execution_time = perf_counter() - start_time
-                    log_here(f"{func.__name__} executed in {execution_time:.4f} secsonds.", console=True)
-                    return result
-                except Exception as e:
-                    log_here(str(e), console=True)
-                    return e
-            return func(*args, **kwargs)
+            with metrics.span(name):
+                return func(*args, **kwargs)
         return wrapper
     return decorator